@@ -0,0 +1,150 @@
+import json
+import math
+import os
+import statistics
+import struct
+import tempfile
+import time
+import wave
+
+from settings import SETTINGS_DIR
+
+LATENCY_FILE = os.path.join(SETTINGS_DIR, "latency.json")
+
+CLICK_BPM = 100
+CLICK_COUNT = 16
+CLICK_LEAD_IN = 1.0
+CLICK_RATE = 44100
+
+
+class AudioClock:
+    """Playback position in seconds, anchored to perf_counter_ns.
+
+    The anchor starts at the moment play() returned. Once
+    mixer.music.get_pos() reports progress it is moved to the start implied
+    by the audio clock, so SDL startup latency never ends up in the
+    timestamps.
+    """
+
+    def __init__(self, get_pos=None, latency_ms=0.0):
+        self.get_pos = get_pos
+        self.latency_ns = int(latency_ms * 1_000_000)
+        self.anchor_ns = None
+        self.offset_ns = 0
+        self.synced = False
+
+    def start(self, offset=0.0):
+        self.anchor_ns = time.perf_counter_ns()
+        self.offset_ns = int(offset * 1e9)
+        self.synced = False
+        self.reconcile()
+
+    def reconcile(self, now_ns=None):
+        if self.get_pos is None or self.anchor_ns is None:
+            return
+
+        pos_ms = self.get_pos()
+        if pos_ms <= 0:
+            return
+
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        # get_pos only advances once per mixer buffer, so it lags the true
+        # position; the earliest implied start seen is the best estimate.
+        implied = now_ns - pos_ms * 1_000_000
+        if not self.synced or implied < self.anchor_ns:
+            self.anchor_ns = implied
+            self.synced = True
+
+    def position_ns(self, now_ns=None):
+        # Reconcile against the current time even when asked about an
+        # earlier instant (e.g. the moment a key was pressed).
+        self.reconcile()
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        return self.offset_ns + now_ns - self.anchor_ns - self.latency_ns
+
+    def position(self, now_ns=None):
+        return self.position_ns(now_ns) / 1e9
+
+
+def device_key(mixer_init):
+    """Calibration key for the mixer's output: SDL driver and sample format.
+
+    The mixer always opens the system default output, and SDL doesn't say
+    which physical device that is, so outputs sharing a driver and format
+    share one calibration. ("default" stays in the key so saved
+    calibrations keep matching.)
+    """
+    driver = os.environ.get("SDL_AUDIODRIVER", "default")
+    if mixer_init:
+        frequency, size, channels = mixer_init[:3]
+        return f"{driver}/default/{frequency}Hz/{size}bit/{channels}ch"
+    return f"{driver}/default"
+
+
+def load_latencies(file_path=LATENCY_FILE):
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_latency(key, file_path=LATENCY_FILE):
+    return float(load_latencies(file_path).get(key, 0.0))
+
+
+def save_latency(key, latency_ms, file_path=LATENCY_FILE):
+    latencies = load_latencies(file_path)
+    latencies[key] = round(latency_ms, 2)
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(latencies, f, indent=2)
+    os.replace(tmp_path, file_path)
+
+
+def click_times(count=CLICK_COUNT, bpm=CLICK_BPM, lead_in=CLICK_LEAD_IN):
+    interval = 60.0 / bpm
+    return [lead_in + i * interval for i in range(count)]
+
+
+def write_click_track(file_path, count=CLICK_COUNT, bpm=CLICK_BPM, lead_in=CLICK_LEAD_IN, rate=CLICK_RATE):
+    times = click_times(count, bpm, lead_in)
+    total = int((times[-1] + 1.0) * rate)
+    click_len = int(0.015 * rate)
+    samples = bytearray(total * 2)
+
+    for t in times:
+        start = int(t * rate)
+        for i in range(click_len):
+            envelope = 1.0 - i / click_len
+            value = int(20000 * envelope * math.sin(2 * math.pi * 1500 * i / rate))
+            struct.pack_into('<h', samples, (start + i) * 2, value)
+
+    with wave.open(file_path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(bytes(samples))
+
+    return times
+
+
+def make_click_track():
+    fd, file_path = tempfile.mkstemp(suffix=".wav", prefix="latency_click_")
+    os.close(fd)
+    return file_path, write_click_track(file_path)
+
+
+def estimate_latency(taps, clicks, window=0.3):
+    """Median tap-minus-click offset in ms, ignoring taps with no nearby click."""
+    offsets = []
+    for tap in taps:
+        nearest = min(clicks, key=lambda c: abs(c - tap))
+        if abs(nearest - tap) <= window:
+            offsets.append(tap - nearest)
+
+    if len(offsets) < 4:
+        return None
+    return statistics.median(offsets) * 1000
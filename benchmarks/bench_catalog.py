@@ -0,0 +1,66 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import headless  # noqa: F401  (puts the repo root on sys.path)
+
+from catalog import Catalog
+
+WORDS = (
+    "love night heart fire dream light rain dance road home sky burn slow gold "
+    "river shadow echo wild stay run falling hold forever tonight alone ocean"
+).split()
+
+
+def synthetic_tracks(count, lines_per_track, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        texts = [" ".join(rng.choices(WORDS, k=6)) for _ in range(lines_per_track)]
+        times = [j * 3.5 + rng.random() for j in range(lines_per_track)]
+        yield f"track_{i:06d}", texts, times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Catalog bulk import, phrase search and bulk export.")
+    parser.add_argument("-n", "--tracks", type=int, default=10_000)
+    parser.add_argument("-l", "--lines", type=int, default=40, help="lines per track")
+    parser.add_argument("-q", "--queries", type=int, default=200)
+    parser.add_argument("--export", type=int, default=1000, help="tracks to bulk-export as LRC")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with Catalog(os.path.join(tmp, "catalog.sqlite3")) as catalog:
+            started = time.perf_counter()
+            tracks, lines = catalog.import_tracks(synthetic_tracks(args.tracks, args.lines))
+            elapsed = time.perf_counter() - started
+            print(f"import: {tracks} tracks, {lines} lines in {elapsed:.2f}s ({lines / elapsed:,.0f} lines/s)")
+
+            rng = random.Random(1)
+            phrases = [" ".join(rng.choices(WORDS, k=3)) for _ in range(args.queries)]
+            timings = []
+            hits = 0
+            for phrase in phrases:
+                started = time.perf_counter()
+                hits += len(catalog.search(phrase))
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            print(
+                f"search: {args.queries} three-word phrases, p50 {timings[len(timings) // 2] * 1000:.2f} ms, "
+                f"p99 {timings[int(len(timings) * 0.99)] * 1000:.2f} ms, {hits} hits"
+            )
+
+            started = time.perf_counter()
+            for i in range(args.queries):
+                catalog.lines_between(f"track_{i % tracks:06d}", 30.0, 60.0)
+            print(f"time range: {(time.perf_counter() - started) / args.queries * 1e6:.1f} µs per query")
+
+            names = catalog.track_names()[:args.export]
+            started = time.perf_counter()
+            count = catalog.export(os.path.join(tmp, "out"), ["lrc"], names)
+            print(f"export: {count} tracks as LRC in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import json
+import subprocess
+import sys
+
+from headless import ROOT  # also gives the probe a throwaway settings directory
+
+# Runs in a fresh interpreter so module caches from this process don't hide
+# import cost.
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+import time_lyric
+imported = time.perf_counter()
+result = {
+    "import_s": imported - started,
+    "pygame_imported": "pygame" in sys.modules,
+    "numpy_imported": "numpy" in sys.modules,
+}
+try:
+    import tkinter as tk
+    root = tk.Tk()
+except Exception as e:
+    result["first_frame_s"] = None
+    result["skipped"] = f"no display: {e}"
+else:
+    shown = []
+    root.bind("<Map>", lambda e: shown.append(time.perf_counter()) if e.widget is root and not shown else None)
+    created = time.perf_counter()
+    app = time_lyric.LyricsTimestampGenerator(root)
+    constructed = time.perf_counter()
+    while not shown and time.perf_counter() - created < 10:
+        root.update()
+    result["construct_s"] = constructed - created
+    result["first_frame_s"] = (shown[0] if shown else time.perf_counter()) - started
+    root.destroy()
+print(json.dumps(result))
+"""
+
+
+def measure(runs):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import time and time-to-first-frame of the GUI.")
+    parser.add_argument("-r", "--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args(argv)
+
+    results = measure(args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    best_import = min(r["import_s"] for r in results)
+    print(f"import time_lyric: {best_import * 1000:.1f} ms (best of {args.runs})")
+    print(f"pygame imported at startup: {results[0]['pygame_imported']}")
+    print(f"numpy imported at startup: {results[0]['numpy_imported']}")
+
+    frames = [r["first_frame_s"] for r in results if r.get("first_frame_s") is not None]
+    if frames:
+        print(f"time to first frame: {min(frames) * 1000:.1f} ms (best of {len(frames)})")
+    else:
+        print(f"time to first frame: skipped ({results[0].get('skipped')})")
+
+
+if __name__ == "__main__":
+    main()
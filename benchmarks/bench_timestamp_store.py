@@ -0,0 +1,70 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lyric_core import write_json
+from timestamp_store import TimestampStore, make_entry
+
+
+def build_dicts(lyrics, times):
+    return [make_entry(lyrics[i], t) for i, t in enumerate(times)]
+
+
+def build_store(lyrics, times):
+    store = TimestampStore(lyrics)
+    for i, t in enumerate(times):
+        store.append(i, t)
+    return store
+
+
+def measure_memory(build, lyrics, times):
+    gc.collect()
+    tracemalloc.start()
+    result = build(lyrics, times)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def measure_write(write, data, file_path):
+    started = time.perf_counter()
+    write(data, file_path)
+    return time.perf_counter() - started
+
+
+def write_dicts(timestamps, file_path):
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(timestamps, ensure_ascii=False, indent=2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory and serialization cost of timestamp storage.")
+    parser.add_argument("-n", "--entries", type=int, default=1_000_000)
+    parser.add_argument("--output", default=os.devnull)
+    args = parser.parse_args(argv)
+
+    lyrics = [f"Lyric line number {i} with some words" for i in range(args.entries)]
+    times = [i * 0.25 + 0.0123 for i in range(args.entries)]
+
+    dicts, dict_bytes = measure_memory(build_dicts, lyrics, times)
+    dict_write = measure_write(write_dicts, dicts, args.output)
+    del dicts
+
+    store, store_bytes = measure_memory(build_store, lyrics, times)
+    store_write = measure_write(write_json, store, args.output)
+
+    print(f"{args.entries} entries")
+    print(f"{'':<16}{'memory':>14}{'write json':>14}")
+    print(f"{'list of dicts':<16}{dict_bytes / 1e6:>11.1f} MB{dict_write:>12.2f} s")
+    print(f"{'TimestampStore':<16}{store_bytes / 1e6:>11.1f} MB{store_write:>12.2f} s")
+    print(f"memory: {dict_bytes / max(store_bytes, 1):.1f}x smaller, write: {dict_write / store_write:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exporters import export_many
+from timestamp_store import TimestampStore
+from timing_index import TimingIndex
+
+
+def scan_json(entries, t_ms):
+    current = -1
+    for i, entry in enumerate(entries):
+        if entry["time_ms"] > t_ms:
+            break
+        current = i
+    return current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Active-line lookup: JSON list scan vs binary timing index.")
+    parser.add_argument("-n", "--lines", type=int, nargs="+", default=[60, 5_000, 100_000])
+    parser.add_argument("--fps", type=int, default=60, help="only used to report the per-frame budget")
+    parser.add_argument("--frames", type=int, default=3_600)
+    args = parser.parse_args(argv)
+
+    print(f"{'lines':>8}{'json scan/frame':>18}{'index/frame':>14}{'speedup':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.lines:
+            lyrics = [f"Line {i}" for i in range(count)]
+            store = TimestampStore(lyrics)
+            store.extend([i * 2.5 for i in range(count)])
+            duration = count * 2.5
+
+            json_path = os.path.join(tmp, "timestamps.json")
+            index_path = os.path.join(tmp, "timestamps.lti")
+            export_many(store, {"json": json_path, "index": index_path})
+
+            # Frames sampled across the whole track, as seen by a player seeking around.
+            frames = [duration * i / args.frames for i in range(args.frames)]
+
+            with open(json_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            started = time.perf_counter()
+            expected = [scan_json(entries, t * 1000) for t in frames]
+            scan_time = (time.perf_counter() - started) / len(frames)
+
+            with TimingIndex(index_path) as index:
+                started = time.perf_counter()
+                found = [index.line_at(t) for t in frames]
+                index_time = (time.perf_counter() - started) / len(frames)
+
+            assert found == expected
+            print(
+                f"{count:>8}{scan_time * 1e6:>15.2f} µs{index_time * 1e6:>11.2f} µs"
+                f"{scan_time / index_time:>9.0f}x"
+            )
+
+    print(f"frame budget at {args.fps} Hz: {1e6 / args.fps:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
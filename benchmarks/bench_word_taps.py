@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from headless import make_app, make_root
+
+from exporters import export_many
+from input_latency import LatencyHistogram
+from lyric_core import WordTimingSession
+
+WORDS_PER_LINE = 8
+
+
+def make_lyrics(line_count):
+    return [" ".join(f"word{i}_{w}" for w in range(WORDS_PER_LINE)) for i in range(line_count)]
+
+
+def paced_taps(tap, rate, seconds):
+    """Call tap() at a steady rate; returns handler time and lateness histograms."""
+    handler = LatencyHistogram("handler")
+    lateness = LatencyHistogram("lateness")
+    interval_ns = int(1e9 / rate)
+    started = time.perf_counter_ns()
+
+    for i in range(int(rate * seconds)):
+        due = started + i * interval_ns
+        while time.perf_counter_ns() < due:
+            time.sleep(max(0.0, (due - time.perf_counter_ns()) / 1e9 - 0.001))
+        begin = time.perf_counter_ns()
+        tap()
+        handler.add((time.perf_counter_ns() - begin) / 1e6)
+        lateness.add((begin - due) / 1e6)
+
+    return handler, lateness
+
+
+def bench_core(rate, seconds):
+    lyrics = make_lyrics(int(rate * seconds) // WORDS_PER_LINE + 1)
+    session = WordTimingSession(lyrics)
+    session.start()
+    handler, lateness = paced_taps(session.tap, rate, seconds)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        targets = {name: os.path.join(tmp, f"words.{name}") for name in ("elrc", "json-words")}
+        started = time.perf_counter()
+        export_many(session.timestamps, targets)
+        export_s = time.perf_counter() - started
+
+    return {
+        "path": "core",
+        "words": len(session.words),
+        "handler": handler.summary(),
+        "lateness": lateness.summary(),
+        "export_ms": export_s * 1000,
+    }
+
+
+def bench_gui(root, rate, seconds):
+    lyrics = make_lyrics(int(rate * seconds) // WORDS_PER_LINE + 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(root, lyrics, os.path.join(tmp, "journal.jsonl"))
+        app.word_mode_var.set(True)
+        app.begin_session()
+
+        def tap():
+            app.next_line()
+            root.update()
+
+        handler, lateness = paced_taps(tap, rate, seconds)
+        app.journal.close()
+        app.notebook.destroy()
+
+    return {
+        "path": "gui",
+        "words": len(app.session.words),
+        "handler": handler.summary(),
+        "lateness": lateness.summary(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Word-timing hot path under a steady tap rate.")
+    parser.add_argument("--rate", type=float, default=20.0, help="taps per second")
+    parser.add_argument("-s", "--seconds", type=float, default=10.0)
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [bench_core(args.rate, args.seconds)]
+    root = make_root()
+    if root is not None:
+        results.append(bench_gui(root, args.rate, args.seconds))
+        root.destroy()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for r in results:
+        h, late = r["handler"], r["lateness"]
+        print(
+            f"{r['path']:<5} {r['words']} words @ {args.rate:g}/s | handler p50 {h['p50_ms']:.3f} ms, "
+            f"p99 {h['p99_ms']:.3f} ms, max {h['max_ms']:.3f} ms | late p99 {late['p99_ms']:.3f} ms"
+        )
+        if "export_ms" in r:
+            print(f"      word-level export (elrc + json-words): {r['export_ms']:.1f} ms")
+    if root is None:
+        print("gui   skipped (no display)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Benchmarks finish real sessions, which save to the catalog and result cache
+# and read the session journal: keep all of that out of the user's settings.
+SETTINGS_DIR = tempfile.mkdtemp(prefix="lyrics-bench-")
+os.environ["LYRICS_SETTINGS_DIR"] = SETTINGS_DIR
+atexit.register(shutil.rmtree, SETTINGS_DIR, ignore_errors=True)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class FakeMusic:
+    """Stand-in for pygame.mixer.music that plays silence on a monotonic clock."""
+
+    def __init__(self):
+        self.started = None
+        self.start_offset = 0.0
+
+    def load(self, file_path):
+        self.started = None
+
+    def play(self, loops=0, start=0.0):
+        self.started = time.perf_counter()
+        self.start_offset = start
+
+    def stop(self):
+        self.started = None
+
+    def get_pos(self):
+        if self.started is None:
+            return -1
+        return int((time.perf_counter() - self.started) * 1000)
+
+
+class FakeMixer:
+    def __init__(self):
+        self.music = FakeMusic()
+
+    def get_init(self):
+        return (44100, -16, 2)
+
+
+class Silent:
+    """Replaces tkinter.messagebox so modal dialogs don't block a benchmark."""
+
+    @staticmethod
+    def showinfo(*args, **kwargs):
+        return "ok"
+
+    showerror = showwarning = showinfo
+
+    @staticmethod
+    def askyesno(*args, **kwargs):
+        return False
+
+
+def make_root():
+    """A withdrawn Tk root, or None when no display is available."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        return None
+    root.withdraw()
+    return root
+
+
+def make_app(root, lyrics, journal_path, profiler=None):
+    import time_lyric
+    from session_journal import SessionJournal
+
+    time_lyric.messagebox = Silent
+    app = time_lyric.LyricsTimestampGenerator(root, profiler)
+    app.journal = SessionJournal(journal_path)
+    app.mixer = FakeMixer()
+    app.device_key = "benchmark"
+    app.audio_loaded = True
+    app.selected_audio_file = "benchmark.wav"
+    app.lyrics = lyrics
+    return app
@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from headless import ROOT
+
+from input_latency import LatencyHistogram
+from timing_server import OP_CLOSE, OP_PING, OP_PONG, OP_TEXT, encode_frame, read_frame
+
+
+async def http_json(host, port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.decode("latin-1").split("\r\n")[1:]:
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    data = await reader.readexactly(length)
+    writer.close()
+    return json.loads(data)
+
+
+async def open_websocket(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode("latin-1")
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    if b" 101 " not in head.split(b"\r\n", 1)[0]:
+        raise ConnectionError(head.decode("latin-1").split("\r\n", 1)[0])
+    return reader, writer
+
+
+def send(writer, message):
+    writer.write(encode_frame(OP_TEXT, json.dumps(message).encode("utf-8"), mask=True))
+
+
+async def operator(host, port, rate, seconds, words, latency, stats):
+    """One simulated operator: own session, WebSocket, steady taps with jitter."""
+    tap_count = int(rate * seconds)
+    lyrics = [f"line {i} with a few words" for i in range(tap_count + 1)]
+    session = await http_json(host, port, "POST", "/sessions", {"lyrics": lyrics, "words": words})
+    reader, writer = await open_websocket(host, port, f"/sessions/{session['id']}/ws")
+
+    sent = {}
+    acked = asyncio.Event()
+
+    async def receive():
+        while True:
+            opcode, payload = await read_frame(reader)
+            now = time.perf_counter_ns()
+            if opcode == OP_PING:
+                writer.write(encode_frame(OP_PONG, payload, mask=True))
+                continue
+            if opcode == OP_CLOSE:
+                return
+            message = json.loads(payload)
+            kind = message.get("type")
+            if kind == "ping":
+                send(writer, {"type": "pong", "n": message["n"]})
+            elif message.get("seq") in sent:
+                started = sent.pop(message["seq"])
+                if kind == "error":
+                    stats["errors"] += 1
+                else:
+                    latency.add((now - started) / 1e6)
+                if message["seq"] == tap_count and not sent:
+                    acked.set()
+
+    receiver = asyncio.create_task(receive())
+    await asyncio.sleep(random.uniform(0, 1.0 / rate))
+    send(writer, {"type": "start", "seq": 0})
+    sent[0] = time.perf_counter_ns()
+
+    interval = 1.0 / rate
+    started = time.perf_counter()
+    for seq in range(1, tap_count + 1):
+        delay = started + seq * interval * random.uniform(0.8, 1.2) - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        sent[seq] = time.perf_counter_ns()
+        send(writer, {"type": "tap", "seq": seq})
+        stats["taps"] += 1
+        await writer.drain()
+
+    try:
+        await asyncio.wait_for(acked.wait(), timeout=10)
+    except asyncio.TimeoutError:
+        stats["lost"] += len(sent)
+    receiver.cancel()
+    writer.write(encode_frame(OP_CLOSE, b"\x03\xe8", mask=True))
+    writer.close()
+
+
+def start_local_server():
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "timing_server.py"), "--port", "0"],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True
+    )
+    line = process.stdout.readline()
+    if not line.startswith("Listening on "):
+        process.kill()
+        raise RuntimeError(f"server did not start: {line!r}")
+    return process, line.split()[-1]
+
+
+async def run(url, clients, rate, seconds, words):
+    parts = urlsplit(url)
+    latency = LatencyHistogram("tap_commit")
+    stats = {"taps": 0, "errors": 0, "lost": 0}
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(operator(parts.hostname, parts.port, rate, seconds, words, latency, stats) for _ in range(clients)),
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+    stats["failed_clients"] = sum(isinstance(r, Exception) for r in results)
+    return latency, stats, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Many concurrent tapping operators against the timing service.")
+    parser.add_argument("--url", default=None, help="server to test (default: start a local one)")
+    parser.add_argument("-c", "--clients", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=4.0, help="taps per second per client")
+    parser.add_argument("-s", "--seconds", type=float, default=10.0)
+    parser.add_argument("--words", action="store_true", help="use word-timing sessions")
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args(argv)
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_local_server()
+    try:
+        latency, stats, elapsed = asyncio.run(run(url, args.clients, args.rate, args.seconds, args.words))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    summary = dict(latency.summary(), **stats, clients=args.clients, seconds=elapsed,
+                   taps_per_sec=stats["taps"] / elapsed if elapsed else 0.0)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(
+        f"{args.clients} clients x {args.rate:g} taps/s for {args.seconds:g}s: "
+        f"{stats['taps']} taps ({summary['taps_per_sec']:.0f}/s), {stats['errors']} errors, "
+        f"{stats['lost']} unacknowledged, {stats['failed_clients']} failed clients"
+    )
+    print(
+        f"tap-commit latency: p50 {summary['p50_ms']:.2f} ms, p90 {summary['p90_ms']:.2f} ms, "
+        f"p99 {summary['p99_ms']:.2f} ms, max {summary['max_ms']:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from headless import ROOT, make_app, make_root
+
+from exporters import export_many
+from lyric_core import TimingSession, WordTimingSession, load_lyrics
+from profiler import Profiler
+
+SIZES = (100, 10_000, 100_000, 1_000_000)
+QUICK_SIZES = (100, 10_000)
+
+BENCHMARKS = []
+
+
+def benchmark(needs_tk=False):
+    def register(func):
+        BENCHMARKS.append((func.__name__, func, needs_tk))
+        return func
+    return register
+
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def result(name, size, seconds, ops):
+    return {
+        "name": name,
+        "size": size,
+        "seconds": seconds,
+        "per_op_us": seconds / ops * 1e6 if ops else None,
+    }
+
+
+def write_lyrics(directory, size):
+    file_path = os.path.join(directory, f"lyrics_{size}.txt")
+    if not os.path.exists(file_path):
+        with open(file_path, "w", encoding="utf-8") as f:
+            for i in range(size):
+                f.write(f"Synthetic lyric line {i} la la la\n\n")
+    return file_path
+
+
+def tapped_session(lyrics):
+    session = TimingSession(lyrics)
+    session.start(now=0.0)
+    for i in range(len(lyrics)):
+        session.tap(now=i * 0.25)
+    return session
+
+
+@benchmark()
+def lyrics_loading(ctx, size):
+    file_path = write_lyrics(ctx["tmp"], size)
+    seconds = best_of(ctx["repeat"], lambda: len(load_lyrics(file_path)))
+    return [result("lyrics_loading", size, seconds, size)]
+
+
+@benchmark()
+def core_tap_session(ctx, size):
+    lyrics = [f"line {i}" for i in range(size)]
+    seconds = best_of(ctx["repeat"], lambda: tapped_session(lyrics))
+    return [result("core_tap_session", size, seconds, size)]
+
+
+@benchmark()
+def word_tap_session(ctx, size):
+    # `size` is the number of words: eight per line.
+    lyrics = [" ".join(f"w{i}_{w}" for w in range(8)) for i in range(max(1, size // 8))]
+    words = len(lyrics) * 8
+
+    def run():
+        session = WordTimingSession(lyrics)
+        session.start(now=0.0)
+        for i in range(words):
+            session.tap(now=i * 0.05)
+        return session
+
+    seconds = best_of(ctx["repeat"], run)
+    results = [result("word_tap_session", size, seconds, words)]
+
+    session = run()
+    targets = {name: os.path.join(ctx["tmp"], f"words_{name}") for name in ("elrc", "json-words")}
+    seconds = best_of(ctx["repeat"], lambda: export_many(session.timestamps, targets))
+    results.append(result("serialization.words", size, seconds, words))
+    return results
+
+
+@benchmark()
+def take_consensus(ctx, size):
+    try:
+        from takes import merge_takes
+    except ImportError:
+        return []
+
+    lyrics = [f"line {i}" for i in range(size)]
+    takes = []
+    for k in range(10):
+        session = TimingSession(lyrics)
+        takes.append([i * 2.5 + 0.1 * k + 0.01 * ((i * 7 + k * 3) % 5) for i in range(size)])
+
+    seconds = best_of(ctx["repeat"], lambda: merge_takes(takes, size))
+    return [result("take_consensus_10", size, seconds, size)]
+
+
+@benchmark()
+def profiler_span(ctx, size):
+    timed = Profiler().wrap("noop", lambda: None)
+
+    def run():
+        for _ in range(size):
+            timed()
+
+    seconds = best_of(ctx["repeat"], run)
+    return [result("profiler_span", size, seconds, size)]
+
+
+@benchmark()
+def serialization(ctx, size):
+    session = tapped_session([f"line {i}" for i in range(size)])
+    results = []
+    for name in ("json", "json-compact", "lrc", "srt", "vtt", "index"):
+        target = os.path.join(ctx["tmp"], f"out_{name}")
+        seconds = best_of(ctx["repeat"], lambda: export_many(session.timestamps, {name: target}))
+        results.append(result(f"serialization.{name}", size, seconds, size))
+    return results
+
+
+@benchmark(needs_tk=True)
+def gui_next_line(ctx, size):
+    app = make_app(ctx["root"], [f"line {i}" for i in range(size)], os.path.join(ctx["tmp"], "journal.jsonl"))
+
+    def run():
+        app.begin_session()
+        for _ in range(size):
+            app.next_line()
+        app.journal.close()
+
+    seconds = best_of(ctx["repeat"], run)
+    results = [result("gui_next_line", size, seconds, size)]
+
+    profiled = make_app(
+        ctx["root"], app.lyrics, os.path.join(ctx["tmp"], "journal_profiled.jsonl"), profiler=Profiler()
+    )
+
+    def run_profiled():
+        profiled.begin_session()
+        for _ in range(size):
+            profiled.next_line()
+        profiled.journal.close()
+
+    seconds = best_of(ctx["repeat"], run_profiled)
+    results.append(result("gui_next_line_profiled", size, seconds, size))
+    profiled.profiler.stop(ctx["root"])
+    profiled.notebook.destroy()
+
+    def save():
+        app.save_timestamps()
+        app.writer.flush()
+
+    seconds = best_of(ctx["repeat"], save)
+    results.append(result("gui_save_timestamps", size, seconds, size))
+
+    def render_json():
+        app.update_json_tab()
+        app.root.update_idletasks()
+
+    seconds = best_of(ctx["repeat"], render_json)
+    results.append(result("gui_update_json_tab", size, seconds, 1))
+
+    calls = 1000
+    seconds = best_of(ctx["repeat"], lambda: [app.update_status() for _ in range(calls)])
+    results.append(result("gui_update_status", size, seconds, calls))
+
+    app.notebook.destroy()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmark suite for timing, serialization and UI hot paths.")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="machine-readable results file")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=None, help=f"line counts (default: {SIZES})")
+    parser.add_argument("--quick", action="store_true", help=f"only run sizes {QUICK_SIZES}")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-k", "--only", default=None, help="run benchmarks whose name contains this text")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    root = make_root()
+    results = []
+    skipped = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        output = os.path.abspath(args.output)
+        os.chdir(tmp)
+        try:
+            ctx = {"tmp": tmp, "repeat": args.repeat, "root": root}
+            for name, func, needs_tk in BENCHMARKS:
+                if args.only and args.only not in name:
+                    continue
+                if needs_tk and root is None:
+                    skipped.append({"name": name, "reason": "no display for Tk"})
+                    print(f"{name:<28} skipped (no display)")
+                    continue
+                for size in sizes:
+                    for r in func(ctx, size):
+                        results.append(r)
+                        per_op = f"{r['per_op_us']:.2f} µs/op" if r["per_op_us"] is not None else ""
+                        print(f"{r['name']:<28}{size:>10}{r['seconds'] * 1000:>12.2f} ms  {per_op}")
+        finally:
+            os.chdir(cwd)
+            if root is not None:
+                root.destroy()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "sizes": list(sizes),
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from exporters import EXPORTERS, export_many, strip_extension
+from settings import SETTINGS_DIR
+from timestamp_store import TimestampStore
+from timing_index import TimingIndex
+
+CATALOG_FILE = os.path.join(SETTINGS_DIR, "catalog.sqlite3")
+BATCH_LINES = 50_000
+IMPORT_EXTENSIONS = ('.json', '.lti')
+SCHEMA_VERSION = 1
+
+TRACKS_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    audio TEXT,
+    audio_hash TEXT,
+    line_count INTEGER NOT NULL,
+    imported_at REAL NOT NULL
+);
+"""
+
+SCHEMA = TRACKS_TABLE.format(table="tracks") + """
+CREATE INDEX IF NOT EXISTS tracks_name ON tracks(name);
+CREATE TABLE IF NOT EXISTS lines (
+    id INTEGER PRIMARY KEY,
+    track_id INTEGER NOT NULL REFERENCES tracks(id) ON DELETE CASCADE,
+    line INTEGER NOT NULL,
+    time_ns INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lines_track_time ON lines(track_id, time_ns);
+CREATE UNIQUE INDEX IF NOT EXISTS lines_track_line ON lines(track_id, line);
+CREATE VIRTUAL TABLE IF NOT EXISTS lines_fts USING fts5(text, content='lines', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS lines_fts_delete AFTER DELETE ON lines BEGIN
+    INSERT INTO lines_fts(lines_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# Version 0 keyed tracks on their name, so songs sharing a file name replaced
+# each other. Existing rows keep their name as their key.
+MIGRATE_V0 = """
+BEGIN;
+""" + TRACKS_TABLE.format(table="tracks_v1") + """
+INSERT INTO tracks_v1 (id, key, name, audio, audio_hash, line_count, imported_at)
+    SELECT id, name, name, audio, audio_hash, line_count, imported_at FROM tracks;
+DROP TABLE tracks;
+ALTER TABLE tracks_v1 RENAME TO tracks;
+COMMIT;
+"""
+
+
+def fts_phrase(text):
+    """An FTS5 query matching text as one phrase, whatever punctuation it holds."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def read_timing_file(file_path):
+    """(texts, times in seconds) from a JSON export or a .lti index."""
+    if file_path.lower().endswith('.lti'):
+        with TimingIndex(file_path) as index:
+            return [index.text(i) for i in range(len(index))], [index.time(i) for i in range(len(index))]
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    return [e["text"] for e in entries], [e["time_ms"] / 1000 for e in entries]
+
+
+def track_key(name, audio=None, audio_hash=None):
+    """What makes two saves the same track: the audio's content, else its path, else the name."""
+    if audio_hash:
+        return f"blake2b:{audio_hash}"
+    if audio:
+        return os.path.abspath(audio)
+    return name
+
+
+def find_timing_files(paths):
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, _, names in os.walk(path):
+            for name in sorted(names):
+                if name.lower().endswith(IMPORT_EXTENSIONS):
+                    yield os.path.join(directory, name)
+
+
+class Catalog:
+    """SQLite catalog of timing results: one row per track, one per timed line.
+
+    Tracks are identified by a key (see track_key); names are only for
+    display and may repeat. Line text is indexed with FTS5 (external
+    content, so it isn't stored twice) and times with a (track, time)
+    index. Imports run in batched transactions.
+    """
+
+    def __init__(self, file_path=CATALOG_FILE):
+        if file_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        self.file_path = file_path
+        self.db = sqlite3.connect(file_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+        self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _migrate(self):
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(tracks)")]
+        if version == 0 and columns and "key" not in columns:
+            # Foreign keys stay off while tracks is rebuilt, or dropping it would cascade to lines.
+            self.db.execute("PRAGMA foreign_keys=OFF")
+            self.db.executescript(MIGRATE_V0)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _add_track(self, name, texts, times, key=None, audio=None, audio_hash=None):
+        key = key or name
+        cursor = self.db.cursor()
+        cursor.execute("DELETE FROM tracks WHERE key = ?", (key,))
+        cursor.execute(
+            "INSERT INTO tracks (key, name, audio, audio_hash, line_count, imported_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, name, audio, audio_hash, len(texts), time.time())
+        )
+        track_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO lines (track_id, line, time_ns, text) VALUES (?, ?, ?, ?)",
+            ((track_id, i, round(t * 1e9), text) for i, (text, t) in enumerate(zip(texts, times)))
+        )
+        cursor.execute(
+            "INSERT INTO lines_fts (rowid, text) SELECT id, text FROM lines WHERE track_id = ?", (track_id,)
+        )
+        return track_id
+
+    def add_timestamps(self, name, timestamps, audio=None, audio_hash=None):
+        texts = [text for text, _ in timestamps.items()]
+        times = [timestamps.time(i) for i in range(len(timestamps))]
+        with self.db:
+            return self._add_track(name, texts, times, track_key(name, audio, audio_hash), audio, audio_hash)
+
+    def import_tracks(self, tracks_iter, batch_lines=BATCH_LINES):
+        """Import (name, texts, times[, key]) tuples, committing every batch_lines lines. Returns (tracks, lines).
+
+        Without a key, tracks of the same name replace each other.
+        """
+        tracks = lines = pending = 0
+        self.db.execute("BEGIN")
+        try:
+            for name, texts, times, *key in tracks_iter:
+                self._add_track(name, texts, times, *key)
+                tracks += 1
+                lines += len(texts)
+                pending += len(texts)
+                if pending >= batch_lines:
+                    self.db.execute("COMMIT")
+                    self.db.execute("BEGIN")
+                    pending = 0
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return tracks, lines
+
+    def import_files(self, file_paths, batch_lines=BATCH_LINES, report=None):
+        # song.json, song.lti, song.min.json ... are one track saved in several
+        # formats: key on the path without its export extension and import the
+        # first readable file of each.
+        imported = set()
+
+        def read_all():
+            for file_path in file_paths:
+                key = strip_extension(os.path.abspath(file_path))
+                if key in imported:
+                    continue
+                try:
+                    texts, times = read_timing_file(file_path)
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    if report is not None:
+                        report(f"✗ {file_path}: {e}")
+                    continue
+                imported.add(key)
+                yield os.path.basename(key), texts, times, key
+
+        return self.import_tracks(read_all(), batch_lines)
+
+    def search(self, phrase, limit=50):
+        """(track, line, time in seconds, text) for lines containing phrase, in import order."""
+        rows = self.db.execute(
+            "SELECT t.name, l.line, l.time_ns, l.text FROM lines_fts "
+            "JOIN lines l ON l.id = lines_fts.rowid JOIN tracks t ON t.id = l.track_id "
+            "WHERE lines_fts MATCH ? LIMIT ?",
+            (fts_phrase(phrase), limit)
+        )
+        return [(name, line, t_ns / 1e9, text) for name, line, t_ns, text in rows]
+
+    def lines_between(self, name, t0, t1):
+        """(line, time in seconds, text) for lines of the tracks called name starting in [t0, t1)."""
+        rows = self.db.execute(
+            "SELECT l.line, l.time_ns, l.text FROM lines l JOIN tracks t ON t.id = l.track_id "
+            "WHERE t.name = ? AND l.time_ns >= ? AND l.time_ns < ? ORDER BY l.time_ns",
+            (name, round(t0 * 1e9), round(t1 * 1e9))
+        )
+        return [(line, t_ns / 1e9, text) for line, t_ns, text in rows]
+
+    def track_names(self):
+        return [name for (name,) in self.db.execute("SELECT DISTINCT name FROM tracks ORDER BY name")]
+
+    def iter_tracks(self, names=None):
+        """Yield (name, TimestampStore) one track at a time from a single ordered scan."""
+        query = "SELECT l.track_id, t.name, l.time_ns, l.text FROM lines l JOIN tracks t ON t.id = l.track_id"
+        params = ()
+        if names is not None:
+            params = tuple(names)
+            query += f" WHERE t.name IN ({', '.join('?' * len(params))})"
+        query += " ORDER BY l.track_id, l.line"
+        current = current_name = None
+        texts, times_ns = [], []
+
+        def finish():
+            store = TimestampStore(texts)
+            store.lines.extend(range(len(texts)))
+            store.times_ns.extend(times_ns)
+            return current_name, store
+
+        for track_id, name, t_ns, text in self.db.execute(query, params):
+            if track_id != current:
+                if current is not None:
+                    yield finish()
+                current, current_name, texts, times_ns = track_id, name, [], []
+            texts.append(text)
+            times_ns.append(t_ns)
+        if current is not None:
+            yield finish()
+
+    def export(self, output_dir, formats=("json",), names=None):
+        """Write every track to output_dir in each format; returns the number of tracks.
+
+        Tracks sharing a name get a numeric suffix (song, song-2, ...) instead of overwriting each other.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        count = 0
+        seen = {}
+        for name, store in self.iter_tracks(names):
+            seen[name] = seen.get(name, 0) + 1
+            base = os.path.join(output_dir, name if seen[name] == 1 else f"{name}-{seen[name]}")
+            export_many(store, {fmt: base + EXPORTERS[fmt].extension for fmt in formats})
+            count += 1
+        return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="time_lyric catalog", description="SQLite catalog of timing results.")
+    parser.add_argument("--db", default=CATALOG_FILE, help=f"catalog file (default: {CATALOG_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("import", help="import JSON / .lti timing files or directories of them")
+    add.add_argument("paths", nargs="+")
+
+    find = commands.add_parser("search", help="find lines containing a phrase across all tracks")
+    find.add_argument("phrase")
+    find.add_argument("-n", "--limit", type=int, default=50)
+
+    out = commands.add_parser("export", help="write every catalogued track in one or more formats")
+    out.add_argument("-o", "--output-dir", default="timestamps")
+    out.add_argument("-f", "--format", dest="formats", action="append", choices=sorted(EXPORTERS))
+    out.add_argument("-t", "--track", dest="tracks", action="append", help="only this track (may be repeated)")
+    args = parser.parse_args(argv)
+
+    with Catalog(args.db) as catalog:
+        started = time.perf_counter()
+        if args.command == "import":
+            tracks, lines = catalog.import_files(find_timing_files(args.paths), report=print)
+            elapsed = time.perf_counter() - started
+            print(f"Imported {tracks} tracks, {lines} lines in {elapsed:.2f}s")
+        elif args.command == "search":
+            for name, line, t, text in catalog.search(args.phrase, args.limit):
+                print(f"{name}\t{line + 1}\t{t:.2f}s\t{text}")
+            print(f"({(time.perf_counter() - started) * 1000:.1f} ms)", file=sys.stderr)
+        else:
+            count = catalog.export(args.output_dir, args.formats or ["json"], args.tracks)
+            print(f"Exported {count} tracks to {args.output_dir} in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
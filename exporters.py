@@ -0,0 +1,311 @@
+import os
+from array import array
+from contextlib import ExitStack
+from json.encoder import encode_basestring
+
+from timing_index import write_index
+
+WRITE_BATCH = 4096
+COPY_CHUNK = 1 << 20
+LAST_LINE_DURATION = 4.0
+
+EXPORTERS = {}
+
+
+def register_exporter(cls):
+    EXPORTERS[cls.name] = cls
+    return cls
+
+
+def get_exporter(name):
+    try:
+        return EXPORTERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown export format: {name}") from None
+
+
+def format_clock(t, separator='.', hours=True):
+    total_ms = max(0, int(round(t * 1000)))
+    h, rest = divmod(total_ms, 3_600_000)
+    m, rest = divmod(rest, 60_000)
+    s, ms = divmod(rest, 1000)
+    if hours:
+        return f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+    return f"{h * 60 + m:02d}:{s:02d}{separator}{ms:03d}"
+
+
+def format_lrc_time(t):
+    centiseconds = max(0, int(round(t * 100)))
+    m, rest = divmod(centiseconds, 6000)
+    s, cs = divmod(rest, 100)
+    return f"{m:02d}:{s:02d}.{cs:02d}"
+
+
+class Exporter:
+    name = ""
+    extension = ""
+    label = ""
+    streaming = True
+    # Word-level exporters get a `words` list of (word, time) for every row
+    # when the timestamps carry word timings.
+    word_level = False
+
+    def header(self):
+        return ""
+
+    def row(self, index, text, start, end, words=None):
+        raise NotImplementedError
+
+    def footer(self, count):
+        return ""
+
+
+@register_exporter
+class JsonExporter(Exporter):
+    name = "json"
+    extension = ".json"
+    label = "JSON"
+
+    def header(self):
+        return "["
+
+    def row(self, index, text, start, end, words=None):
+        return (
+            f'{"," if index else ""}\n  {{\n    "text": {encode_basestring(text)},\n'
+            f'    "time_ms": {int(start * 1000)},\n    "time_seconds": {round(start, 2)!r}\n  }}'
+        )
+
+    def footer(self, count):
+        return "\n]" if count else "]"
+
+
+@register_exporter
+class CompactJsonExporter(Exporter):
+    name = "json-compact"
+    extension = ".min.json"
+    label = "Compact JSON"
+
+    def header(self):
+        return "["
+
+    def row(self, index, text, start, end, words=None):
+        return (
+            f'{"," if index else ""}{{"text":{encode_basestring(text)},'
+            f'"time_ms":{int(start * 1000)},"time_seconds":{round(start, 2)!r}}}'
+        )
+
+    def footer(self, count):
+        return "]"
+
+
+@register_exporter
+class WordJsonExporter(Exporter):
+    name = "json-words"
+    extension = ".words.json"
+    label = "Word JSON"
+    word_level = True
+
+    def header(self):
+        return "["
+
+    def row(self, index, text, start, end, words=None):
+        word_rows = ",".join(
+            f'{{"text":{encode_basestring(word)},"time_ms":{int(t * 1000)},"time_seconds":{round(t, 2)!r}}}'
+            for word, t in words or ()
+        )
+        return (
+            f'{"," if index else ""}\n{{"text":{encode_basestring(text)},'
+            f'"time_ms":{int(start * 1000)},"time_seconds":{round(start, 2)!r},"words":[{word_rows}]}}'
+        )
+
+    def footer(self, count):
+        return "\n]" if count else "]"
+
+
+@register_exporter
+class LrcExporter(Exporter):
+    name = "lrc"
+    extension = ".lrc"
+    label = "LRC"
+
+    def row(self, index, text, start, end, words=None):
+        return f"[{format_lrc_time(start)}]{text}\n"
+
+
+@register_exporter
+class EnhancedLrcExporter(Exporter):
+    name = "elrc"
+    extension = ".elrc.lrc"
+    label = "Enhanced LRC"
+    word_level = True
+
+    def row(self, index, text, start, end, words=None):
+        if not words:
+            return f"[{format_lrc_time(start)}]<{format_lrc_time(start)}>{text}<{format_lrc_time(end)}>\n"
+        tags = " ".join(f"<{format_lrc_time(t)}>{word}" for word, t in words)
+        return f"[{format_lrc_time(start)}]{tags} <{format_lrc_time(end)}>\n"
+
+
+@register_exporter
+class SrtExporter(Exporter):
+    name = "srt"
+    extension = ".srt"
+    label = "SRT"
+
+    def row(self, index, text, start, end, words=None):
+        return f"{index + 1}\n{format_clock(start, ',')} --> {format_clock(end, ',')}\n{text}\n\n"
+
+
+@register_exporter
+class WebVttExporter(Exporter):
+    name = "vtt"
+    extension = ".vtt"
+    label = "WebVTT"
+
+    def header(self):
+        return "WEBVTT\n\n"
+
+    def row(self, index, text, start, end, words=None):
+        return f"{format_clock(start)} --> {format_clock(end)}\n{text}\n\n"
+
+
+@register_exporter
+class TimingIndexExporter(Exporter):
+    name = "index"
+    extension = ".lti"
+    label = "Binary index"
+    streaming = False
+
+    def write(self, timestamps, file_path):
+        write_index(timestamps, file_path)
+
+
+def iter_cues(timestamps, first=0):
+    """Yield (text, start, end) with each line ending where the next begins."""
+    previous = None
+    for text, t in timestamps.items(first):
+        if previous is not None:
+            yield previous[0], previous[1], t
+        previous = (text, t)
+    if previous is not None:
+        yield previous[0], previous[1], previous[1] + LAST_LINE_DURATION
+
+
+class _Output:
+    def __init__(self, exporter, file_path, f, first, position, row_offsets):
+        self.exporter = exporter
+        self.file_path = file_path
+        self.f = f
+        self.first = first
+        self.position = position
+        self.row_offsets = row_offsets
+        self.pending = []
+
+    def add(self, index, text, start, end, words=None):
+        data = self.exporter.row(index, text, start, end, words).encode("utf-8")
+        self.row_offsets.append(self.position)
+        self.position += len(data)
+        self.pending.append(data)
+        if len(self.pending) >= WRITE_BATCH:
+            self.flush()
+
+    def flush(self):
+        self.f.write(b"".join(self.pending))
+        self.pending.clear()
+
+
+def _copy_prefix(file_path, f, size):
+    with open(file_path, "rb") as src:
+        while size > 0:
+            chunk = src.read(min(COPY_CHUNK, size))
+            if not chunk:
+                raise OSError(f"{file_path} is shorter than its previous export")
+            f.write(chunk)
+            size -= len(chunk)
+
+
+def _open_output(stack, exporter, file_path, first, previous):
+    f = stack.enter_context(open(file_path + ".tmp", "wb"))
+
+    # Rows before `first` are unchanged from the previous export, so their
+    # bytes are copied as-is and only the tail is formatted again.
+    if previous is not None and first < len(previous) and os.path.exists(file_path):
+        _copy_prefix(file_path, f, previous[first])
+        return _Output(exporter, file_path, f, first, previous[first], previous[:first])
+
+    header = exporter.header().encode("utf-8")
+    f.write(header)
+    return _Output(exporter, file_path, f, 0, len(header), array('q'))
+
+
+def export_many(timestamps, targets, previous=None, first=0):
+    """Write every {format: file_path} target in one pass over the timestamps.
+
+    Returns {file_path: row byte offsets}. Passing those back as `previous`
+    together with the index of the first changed entry rewrites only the
+    rows from there on.
+
+    Every file is written next to its target and moved into place with
+    os.replace once all of them are complete, so readers never see a
+    partial export.
+    """
+    previous = previous or {}
+    exporters = [(get_exporter(name), file_path) for name, file_path in targets.items()]
+    offsets = {}
+
+    try:
+        for exporter, file_path in exporters:
+            if not exporter.streaming:
+                exporter.write(timestamps, file_path + ".tmp")
+
+        # A line's end time is the next line's start, so the row before the
+        # first changed entry has to be rewritten too.
+        first = max(0, first - 1)
+
+        with ExitStack() as stack:
+            outputs = [
+                _open_output(stack, exporter, file_path, first, previous.get(file_path))
+                for exporter, file_path in exporters if exporter.streaming
+            ]
+            begin = min((output.first for output in outputs), default=0)
+            word_times = timestamps.words if any(output.exporter.word_level for output in outputs) else None
+
+            count = begin
+            words = None
+            for index, (text, start, end) in enumerate(iter_cues(timestamps, begin), begin):
+                if word_times is not None:
+                    words = word_times.line_words(index)
+                for output in outputs:
+                    if index >= output.first:
+                        output.add(index, text, start, end, words)
+                count = index + 1
+
+            for output in outputs:
+                output.flush()
+                output.f.write(output.exporter.footer(count).encode("utf-8"))
+                offsets[output.file_path] = output.row_offsets
+
+    except BaseException:
+        for _, file_path in exporters:
+            try:
+                os.remove(file_path + ".tmp")
+            except FileNotFoundError:
+                pass
+        raise
+
+    for _, file_path in exporters:
+        os.replace(file_path + ".tmp", file_path)
+    return offsets
+
+
+def strip_extension(file_path):
+    """file_path without any registered export extension, e.g. song.min.json -> song."""
+    lowered = file_path.lower()
+    for extension in sorted((e.extension for e in EXPORTERS.values()), key=len, reverse=True):
+        if lowered.endswith(extension):
+            return file_path[:-len(extension)]
+    return file_path
+
+
+def export(timestamps, name, file_path):
+    export_many(timestamps, {name: file_path})
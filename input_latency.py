@@ -0,0 +1,106 @@
+import csv
+import json
+import time
+from array import array
+from bisect import bisect_left
+
+WRAP_MS = 1 << 32
+BUCKETS_MS = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class EventClock:
+    """Maps Tk event.time (32-bit ms, arbitrary epoch) onto perf_counter_ns.
+
+    Every observed event gives an upper bound on the offset between the two
+    clocks (the handler always runs after the event); the smallest one seen
+    is the offset with the least queueing delay in it.
+    """
+
+    def __init__(self):
+        self.offset_ns = None
+        self.last_ms = None
+        self.wraps = 0
+
+    def _unwrap(self, event_ms):
+        if self.last_ms is not None and event_ms < self.last_ms - WRAP_MS // 2:
+            self.wraps += 1
+        self.last_ms = event_ms
+        return (event_ms + self.wraps * WRAP_MS) * 1_000_000
+
+    def observe(self, event_ms, now_ns=None):
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        event_ns = self._unwrap(event_ms)
+        offset = now_ns - event_ns
+        if self.offset_ns is None or offset < self.offset_ns:
+            self.offset_ns = offset
+        return event_ns + self.offset_ns
+
+    def to_monotonic(self, event_ms, now_ns=None):
+        """perf_counter_ns at which the event happened, never later than now."""
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        return min(self.observe(event_ms, now_ns), now_ns)
+
+
+class LatencyHistogram:
+    def __init__(self, name):
+        self.name = name
+        self.samples_ms = array('d')
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms):
+        self.samples_ms.append(ms)
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+
+    def percentile(self, p):
+        if not self.samples_ms:
+            return 0.0
+        ordered = sorted(self.samples_ms)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def bucket_labels(self):
+        labels = []
+        lower = 0
+        for upper in BUCKETS_MS:
+            labels.append(f"{lower}–{upper} ms")
+            lower = upper
+        labels.append(f"> {lower} ms")
+        return labels
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "count": len(self.samples_ms),
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": max(self.samples_ms, default=0.0),
+            "buckets": dict(zip(self.bucket_labels(), self.counts)),
+        }
+
+
+class TapLatency:
+    def __init__(self):
+        self.event_to_handler = LatencyHistogram("event_to_handler")
+        self.handler_to_commit = LatencyHistogram("handler_to_commit")
+
+    def record(self, event_ns, handler_ns, commit_ns):
+        self.event_to_handler.add((handler_ns - event_ns) / 1e6)
+        self.handler_to_commit.add((commit_ns - handler_ns) / 1e6)
+
+    def histograms(self):
+        return (self.event_to_handler, self.handler_to_commit)
+
+    def export(self, file_path):
+        if file_path.lower().endswith(".csv"):
+            with open(file_path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["tap", "event_to_handler_ms", "handler_to_commit_ms"])
+                for i, (a, b) in enumerate(zip(self.event_to_handler.samples_ms, self.handler_to_commit.samples_ms)):
+                    writer.writerow([i, f"{a:.3f}", f"{b:.3f}"])
+            return
+
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "summary": [h.summary() for h in self.histograms()],
+                "samples_ms": {h.name: list(h.samples_ms) for h in self.histograms()},
+            }, f, indent=2)
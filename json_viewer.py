@@ -0,0 +1,183 @@
+import bisect
+import json
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+
+
+def parse_time(text):
+    parts = text.strip().split(':')
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+class JsonEntryViewer(tk.Frame):
+    """Scrollable view of timestamp entries that only renders visible rows.
+
+    Each entry is one compact JSON row; scrolling, resizing and jumping
+    re-render just the rows on screen, so cost does not grow with the
+    number of entries.
+    """
+
+    def __init__(self, parent, bg, fg, accent, secondary, font=('Consolas', 12)):
+        super().__init__(parent, bg=bg)
+        self.entries = []
+        self.top = 0
+        self.rows = 1
+        self.highlight = None
+        self.search_from = 0
+
+        toolbar = tk.Frame(self, bg=bg)
+        toolbar.pack(fill='x', pady=(0, 10))
+
+        tk.Label(toolbar, text="🔍 Search:", font=('Arial', 11), fg=secondary, bg=bg).pack(side='left')
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(toolbar, textvariable=self.search_var, font=('Arial', 11), width=30)
+        self.search_entry.pack(side='left', padx=(5, 20))
+        self.search_entry.bind('<KeyRelease>', self._on_search_key)
+        self.search_entry.bind('<Return>', lambda e: self.search(next_match=True))
+
+        tk.Label(toolbar, text="⏱️ Jump to (mm:ss):", font=('Arial', 11), fg=secondary, bg=bg).pack(side='left')
+        self.jump_var = tk.StringVar()
+        jump_entry = tk.Entry(toolbar, textvariable=self.jump_var, font=('Arial', 11), width=10)
+        jump_entry.pack(side='left', padx=(5, 0))
+        jump_entry.bind('<Return>', lambda e: self.jump_to_time_text(self.jump_var.get()))
+
+        self.match_label = tk.Label(toolbar, text="", font=('Arial', 11), fg=secondary, bg=bg)
+        self.match_label.pack(side='left', padx=(20, 0))
+
+        body = tk.Frame(self, bg=bg)
+        body.pack(fill=tk.BOTH, expand=True)
+
+        self.font = tkfont.Font(font=font)
+        self.text = tk.Text(
+            body,
+            font=self.font,
+            bg=bg,
+            fg=fg,
+            wrap=tk.NONE,
+            relief='flat',
+            padx=15,
+            pady=15,
+            cursor='arrow'
+        )
+        self.scrollbar = ttk.Scrollbar(body, orient='vertical', command=self._on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+        self.text.pack(side='left', fill=tk.BOTH, expand=True)
+
+        self.text.tag_configure('index', foreground=secondary)
+        self.text.tag_configure('highlight', background=accent, foreground='#000000')
+        self.text.config(state=tk.DISABLED)
+
+        self.text.bind('<Configure>', self._on_configure)
+        self.text.bind('<MouseWheel>', self._on_mousewheel)
+        self.text.bind('<Button-4>', lambda e: self.scroll_to(self.top - 3))
+        self.text.bind('<Button-5>', lambda e: self.scroll_to(self.top + 3))
+
+    def set_entries(self, entries):
+        self.entries = entries
+        self.highlight = None
+        self.search_from = 0
+        self.top = 0
+        self.render()
+
+    def refresh(self):
+        self.scroll_to(self.top)
+
+    def scroll_to(self, index):
+        self.top = max(0, min(index, len(self.entries) - self.rows))
+        self.render()
+
+    def show(self, index):
+        if index < self.top or index >= self.top + self.rows:
+            self.top = index - self.rows // 2
+        self.scroll_to(self.top)
+
+    def render(self):
+        count = len(self.entries)
+        end = min(self.top + self.rows, count)
+        width = len(str(count))
+
+        self.text.config(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        for i in range(self.top, end):
+            if i > self.top:
+                self.text.insert(tk.END, "\n")
+            self.text.insert(tk.END, f"{i + 1:>{width}}  ", 'index')
+            row = json.dumps(self.entries[i], ensure_ascii=False)
+            self.text.insert(tk.END, row + ("," if i < count - 1 else ""), 'highlight' if i == self.highlight else ())
+        self.text.config(state=tk.DISABLED)
+
+        if count:
+            self.scrollbar.set(self.top / count, end / count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def search(self, next_match=False):
+        query = self.search_var.get().strip().lower()
+        count = len(self.entries)
+        if not query or not count:
+            self.highlight = None
+            self.match_label.config(text="")
+            self.render()
+            return None
+
+        start = self.search_from + 1 if next_match and self.highlight is not None else self.search_from
+        for step in range(count):
+            i = (start + step) % count
+            if query in self.entries[i]["text"].lower():
+                self.search_from = i
+                self.highlight = i
+                self.match_label.config(text=f"Line {i + 1} of {count}")
+                self.show(i)
+                return i
+
+        self.highlight = None
+        self.match_label.config(text="No matches")
+        self.render()
+        return None
+
+    def jump_to_time(self, seconds):
+        if not self.entries:
+            return None
+        index = bisect.bisect_right(self.entries, seconds * 1000, key=lambda e: e["time_ms"]) - 1
+        index = max(0, index)
+        self.highlight = index
+        self.search_from = index
+        self.show(index)
+        return index
+
+    def jump_to_time_text(self, text):
+        try:
+            seconds = parse_time(text)
+        except ValueError:
+            self.match_label.config(text="Use seconds or mm:ss")
+            return None
+        index = self.jump_to_time(seconds)
+        if index is not None:
+            self.match_label.config(text=f"Line {index + 1} at {self.entries[index]['time_seconds']}s")
+        return index
+
+    def _on_search_key(self, event):
+        if event.keysym != 'Return':
+            self.search()
+
+    def _on_configure(self, event):
+        rows = max(1, (event.height - 30) // self.font.metrics('linespace'))
+        if rows != self.rows:
+            self.rows = rows
+            self.refresh()
+
+    def _on_mousewheel(self, event):
+        self.scroll_to(self.top - 3 * int(event.delta / 120))
+        return 'break'
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * len(self.entries)))
+        elif unit == 'pages':
+            self.scroll_to(self.top + int(amount) * self.rows)
+        else:
+            self.scroll_to(self.top + int(amount))
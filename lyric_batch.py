@@ -0,0 +1,260 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import wave
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from exporters import EXPORTERS, export_many
+from lyric_core import TimingSession, load_lyrics
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.ogg', '.m4a')
+LYRICS_EXTENSION = '.txt'
+TAPS_EXTENSION = '.taps'
+
+
+def load_taps(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return [float(line) for line in f if line.strip()]
+
+
+def audio_duration(file_path):
+    if file_path.lower().endswith('.wav'):
+        with wave.open(file_path, 'rb') as w:
+            return w.getnframes() / float(w.getframerate())
+
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    from pygame import mixer
+    if not mixer.get_init():
+        mixer.init()
+    return mixer.Sound(file_path).get_length()
+
+
+def draft_times(line_count, duration):
+    step = duration / (line_count + 1)
+    return [step * (i + 1) for i in range(line_count)]
+
+
+def onset_draft(audio_path, line_count):
+    """One detected onset per line, or None when NumPy isn't available."""
+    try:
+        import onsets
+    except ImportError:
+        return None
+    samples, rate = onsets.decode_audio(audio_path)
+    times, strengths = onsets.detect_onsets(samples, rate)
+    return onsets.auto_draft(times, strengths, line_count, len(samples) / rate)
+
+
+def jobs_from_directory(directory):
+    names = sorted(os.listdir(directory))
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in AUDIO_EXTENSIONS:
+            continue
+
+        lyrics = os.path.join(directory, stem + LYRICS_EXTENSION)
+        if not os.path.exists(lyrics):
+            continue
+
+        taps = os.path.join(directory, stem + TAPS_EXTENSION)
+        yield {
+            "audio": os.path.join(directory, name),
+            "lyrics": lyrics,
+            "taps": taps if os.path.exists(taps) else None,
+        }
+
+
+def jobs_from_manifest(manifest_path):
+    base = os.path.dirname(os.path.abspath(manifest_path))
+
+    def resolve(path):
+        return path if not path or os.path.isabs(path) else os.path.join(base, path)
+
+    def parse_json(line):
+        try:
+            return json.loads(line)
+        except ValueError as e:
+            return e
+
+    with open(manifest_path, "r", encoding="utf-8", newline='') as f:
+        if manifest_path.lower().endswith('.csv'):
+            rows = csv.DictReader(f)
+        else:
+            rows = (parse_json(line) for line in f if line.strip())
+
+        # A bad row becomes a failed job instead of stopping the whole batch.
+        for number, row in enumerate(rows, 1):
+            where = f"{os.path.basename(manifest_path)} row {number}"
+            if isinstance(row, Exception):
+                yield {"audio": where, "error": f"invalid JSON: {row}"}
+                continue
+            if not isinstance(row, dict) or not row.get("audio") or not row.get("lyrics"):
+                yield {"audio": where, "error": "needs 'audio' and 'lyrics'"}
+                continue
+            yield {
+                "audio": resolve(str(row["audio"])),
+                "lyrics": resolve(str(row["lyrics"])),
+                "taps": resolve(str(row.get("taps") or "") or None),
+                "output": row.get("output") or None,
+            }
+
+
+def output_stem(job):
+    if job.get("stem"):
+        return job["stem"]
+    if job.get("output"):
+        return os.path.splitext(job["output"])[0]
+    return os.path.splitext(os.path.basename(job["audio"]))[0]
+
+
+def claim_output(job, claimed):
+    """job, renamed if an earlier job in the batch already writes to its stem.
+
+    song.mp3 and song.wav would both write song.*; the later one gets the
+    audio extension appended (song_wav, then song_wav_2, ...).
+    """
+    stem = output_stem(job)
+    if os.path.normcase(stem) in claimed:
+        base = stem + "_" + os.path.splitext(job["audio"])[1].lstrip(".").lower()
+        stem, n = base, 2
+        while os.path.normcase(stem) in claimed:
+            stem = f"{base}_{n}"
+            n += 1
+        job = dict(job, stem=stem)
+    claimed.add(os.path.normcase(stem))
+    return job
+
+
+def output_targets(job, output_dir, formats):
+    base = os.path.join(output_dir, output_stem(job))
+    return {name: base + EXPORTERS[name].extension for name in formats}
+
+
+def process_job(job, output_dir, formats=("json",), draft="onsets"):
+    started = time.perf_counter()
+    lyrics = load_lyrics(job["lyrics"])
+
+    if job.get("taps"):
+        times = load_taps(job["taps"])
+        if len(times) != len(lyrics):
+            raise ValueError(f"{os.path.basename(job['taps'])} has {len(times)} taps for {len(lyrics)} lyric lines")
+    else:
+        times = onset_draft(job["audio"], len(lyrics)) if draft == "onsets" else None
+        if times is None:
+            times = draft_times(len(lyrics), audio_duration(job["audio"]))
+
+    session = TimingSession(lyrics)
+    timestamps = session.replay(times)
+
+    targets = output_targets(job, output_dir, formats)
+    # A manifest output may point into subdirectories.
+    os.makedirs(os.path.dirname(os.path.join(output_dir, output_stem(job))) or ".", exist_ok=True)
+    export_many(timestamps, targets)
+
+    return {
+        "audio": job["audio"],
+        "outputs": list(targets.values()),
+        "lines": len(timestamps),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def run_batch(jobs, output_dir, formats=("json",), workers=None, max_pending=None, report=print, draft="onsets"):
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+
+    done_count = 0
+    failed = 0
+    total_lines = 0
+    started = time.perf_counter()
+    jobs = iter(jobs)
+    claimed = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def submit_next():
+            nonlocal done_count, failed
+            job = next(jobs, None)
+            while job is not None and job.get("error"):
+                done_count += 1
+                failed += 1
+                report(f"[{done_count}] ✗ {job['audio']}: {job['error']}")
+                job = next(jobs, None)
+            if job is None:
+                return False
+            job = claim_output(job, claimed)
+            if job.get("stem"):
+                report(f"Note: {os.path.basename(job['audio'])} shares its output name; writing {job['stem']}.* instead")
+            pending[pool.submit(process_job, job, output_dir, formats, draft)] = job
+            return True
+
+        while len(pending) < max_pending and submit_next():
+            pass
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job = pending.pop(future)
+                done_count += 1
+                name = os.path.basename(job["audio"])
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    report(f"[{done_count}] ✗ {name}: {e}")
+                else:
+                    total_lines += result["lines"]
+                    report(f"[{done_count}] ✓ {name}: {result['lines']} lines in {result['seconds']:.2f}s")
+                submit_next()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "tracks": done_count - failed,
+        "failed": failed,
+        "lines": total_lines,
+        "seconds": elapsed,
+        "tracks_per_sec": (done_count - failed) / elapsed if elapsed else 0.0,
+        "lines_per_sec": total_lines / elapsed if elapsed else 0.0,
+    }
+    report(
+        f"Processed {summary['tracks']} tracks ({failed} failed), {total_lines} lines "
+        f"in {elapsed:.2f}s | {summary['tracks_per_sec']:.1f} tracks/sec, "
+        f"{summary['lines_per_sec']:.1f} lines/sec"
+    )
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="time_lyric batch",
+        description="Generate timestamp files for many (audio, lyrics) pairs without the GUI."
+    )
+    parser.add_argument("source", help="directory of audio/lyrics pairs, or a .jsonl/.csv manifest")
+    parser.add_argument("-o", "--output-dir", default="timestamps", help="where to write one output per track")
+    parser.add_argument(
+        "-f", "--format", dest="formats", action="append", choices=sorted(EXPORTERS),
+        help="output format, may be repeated (default: json)"
+    )
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument(
+        "--draft", choices=("onsets", "even"), default="onsets",
+        help="first-pass timing for tracks without taps: detected vocal onsets (needs NumPy) or evenly spaced"
+    )
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.source):
+        jobs = jobs_from_directory(args.source)
+    else:
+        jobs = jobs_from_manifest(args.source)
+
+    summary = run_batch(jobs, args.output_dir, formats=args.formats or ["json"], workers=args.workers, draft=args.draft)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+import hashlib
+import time
+
+from exporters import export
+from lyrics_source import MappedLyrics
+from timestamp_store import TimestampStore, WordTimes, tokenize
+
+
+def parse_lyrics(text):
+    return [line.strip() for line in text.split('\n') if line.strip()]
+
+
+def load_lyrics(file_path):
+    return MappedLyrics(file_path)
+
+
+def lyrics_reference(lyrics):
+    if isinstance(lyrics, MappedLyrics):
+        return {"lyrics_file": lyrics.file_path, "lyrics_stamp": list(lyrics.stamp)}
+    return {"lyrics": list(lyrics)}
+
+
+def lyrics_changed(reference, lyrics):
+    """True when a referenced lyrics file is no longer the version the reference was made from."""
+    stamp = reference.get("lyrics_stamp")
+    return isinstance(lyrics, MappedLyrics) and stamp is not None and tuple(stamp) != lyrics.stamp
+
+
+def resolve_lyrics(reference):
+    if reference.get("lyrics_file"):
+        return load_lyrics(reference["lyrics_file"])
+    return reference.get("lyrics", [])
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_json(timestamps, file_path):
+    export(timestamps, "json", file_path)
+
+
+class TimingSession:
+    def __init__(self, lyrics, clock=time.perf_counter, on_tap=None):
+        self.lyrics = lyrics
+        self.clock = clock
+        self.on_tap = on_tap
+        self.punch_first = None
+        self.punch_last = None
+        self.current_line = 0
+        self.current_word = 0
+        self.recording = False
+        self.start_time = 0
+        self.timestamps = TimestampStore(lyrics)
+
+    @property
+    def finished(self):
+        return self.current_line >= len(self.lyrics)
+
+    @property
+    def punching(self):
+        return self.punch_last is not None
+
+    def start(self, now=None):
+        self.start_time = self.clock() if now is None else now
+        self.timestamps = TimestampStore(self.lyrics)
+        self.current_line = 0
+        self.recording = True
+
+    def resume(self, times, now=None):
+        self.start(now)
+        self.timestamps.extend(times)
+        self.current_line = len(self.timestamps)
+        self.recording = not self.finished
+
+    def punch_in(self, first, last):
+        if self.recording or not 0 <= first <= last < len(self.timestamps):
+            return False
+
+        self.punch_first = first
+        self.punch_last = last
+        self.current_line = first
+        self.recording = True
+        return True
+
+    def end_punch_in(self):
+        self.punch_first = None
+        self.punch_last = None
+        self.current_line = len(self.timestamps)
+        self.recording = False
+
+    def undo(self):
+        if self.punching:
+            if self.current_line == self.punch_first:
+                return None
+            self.current_line -= 1
+            return self.current_line
+
+        if self.current_line == 0 or (not self.recording and not self.finished):
+            return None
+
+        self.current_line -= 1
+        self.timestamps.truncate(self.current_line)
+        self.recording = True
+        return self.current_line
+
+    def stop(self):
+        if self.punching:
+            self.end_punch_in()
+        self.recording = False
+
+    def elapsed(self, now=None):
+        return (self.clock() if now is None else now) - self.start_time
+
+    def tap(self, now=None):
+        if not self.recording or self.finished:
+            return None
+
+        t = self.elapsed(now)
+        if self.punching:
+            self.timestamps.set(self.current_line, t)
+            self.current_line += 1
+            if self.current_line > self.punch_last:
+                self.end_punch_in()
+            return t
+
+        self.timestamps.append(self.current_line, t)
+        if self.on_tap is not None:
+            self.on_tap(self.current_line, t)
+        self.current_line += 1
+
+        if self.finished:
+            self.recording = False
+
+        return t
+
+    def replay(self, times):
+        self.start(now=0)
+        for t in times:
+            if self.tap(now=t) is None:
+                break
+        return self.timestamps
+
+
+class WordTimingSession(TimingSession):
+    """One tap per word; the first word of a line also sets the line's time.
+
+    on_tap still fires once per line, so the journal and anything else
+    line-based see the same events as in a line session.
+    """
+
+    def __init__(self, lyrics, clock=time.perf_counter, on_tap=None):
+        super().__init__(lyrics, clock, on_tap)
+        self.words = WordTimes(lyrics)
+        self.timestamps.words = self.words
+        self.line_word_count = 0
+
+    def start(self, now=None):
+        super().start(now)
+        self.words = WordTimes(self.lyrics)
+        self.timestamps.words = self.words
+        self.current_word = 0
+
+    def resume(self, times, now=None):
+        if times:
+            raise ValueError("word timings can't be rebuilt from line times")
+        super().resume(times, now)
+
+    def punch_in(self, first, last):
+        if not super().punch_in(first, last):
+            return False
+        self.current_word = 0
+        return True
+
+    def end_punch_in(self):
+        super().end_punch_in()
+        self.current_word = 0
+
+    def tap(self, now=None):
+        if not self.recording or self.finished:
+            return None
+
+        t = self.elapsed(now)
+        line = self.current_line
+        if self.current_word == 0:
+            self.line_word_count = len(tokenize(self.lyrics[line]))
+
+        if self.punching:
+            self.words.set(self.words.offsets[line] + self.current_word, t)
+            if self.current_word == 0:
+                self.timestamps.set(line, t)
+        else:
+            if self.current_word == 0:
+                self.timestamps.append(line, t)
+                if self.on_tap is not None:
+                    self.on_tap(line, t)
+            self.words.append(line, t)
+
+        self.current_word += 1
+        if self.current_word < self.line_word_count:
+            return t
+
+        self.current_word = 0
+        self.current_line += 1
+        if self.punching:
+            if self.current_line > self.punch_last:
+                self.end_punch_in()
+        elif self.finished:
+            self.recording = False
+        return t
+
+    def _step_back(self):
+        if self.current_word == 0:
+            self.current_line -= 1
+            self.line_word_count = len(tokenize(self.lyrics[self.current_line]))
+            self.current_word = self.line_word_count - 1
+        else:
+            self.current_word -= 1
+
+    def undo(self):
+        if self.punching:
+            if self.current_line == self.punch_first and self.current_word == 0:
+                return None
+            self._step_back()
+            return self.current_line
+
+        if (self.current_line == 0 and self.current_word == 0) or (not self.recording and not self.finished):
+            return None
+
+        self._step_back()
+        self.words.pop()
+        if self.current_word == 0:
+            self.timestamps.truncate(self.current_line)
+        self.recording = True
+        return self.current_line
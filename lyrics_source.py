@@ -0,0 +1,89 @@
+import mmap
+import os
+import re
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate, compress
+
+INDEX_CHUNK = 1 << 20
+# Like reading in text mode: \r, \n and \r\n all end a line. Splitting on
+# each byte alone is enough, since the empty line inside \r\n is dropped as blank.
+LINE_END = re.compile(rb"[\r\n]")
+TEXT_LINE_END = re.compile(r"[\r\n]")
+
+
+class MappedLyrics(Sequence):
+    """Lyrics file exposed as a sequence of stripped, non-blank lines.
+
+    The file is memory-mapped and indexed in a single streaming pass into
+    an int64 array of line start offsets; a line is only decoded when it is
+    read. Chunks with non-ASCII bytes are decoded while indexing, so a file
+    in the wrong encoding fails here rather than on first display.
+    """
+
+    def __init__(self, file_path, encoding="utf-8"):
+        self.file_path = os.path.abspath(file_path)
+        self.encoding = encoding
+        self.starts = array('q')
+
+        with open(self.file_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            # (size, mtime) of the version indexed, so saved references can tell if it changed since.
+            self.stamp = (stat.st_size, stat.st_mtime_ns)
+            if stat.st_size:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._map = b""
+
+        try:
+            self._build_index()
+        except UnicodeDecodeError:
+            self.close()
+            raise
+
+    def _build_index(self):
+        size = len(self._map)
+        pos = 0
+        while pos < size:
+            chunk_size = INDEX_CHUNK
+            while True:
+                chunk = self._map[pos:pos + chunk_size]
+                cut = max(chunk.rfind(b"\n"), chunk.rfind(b"\r")) + 1
+                if pos + chunk_size >= size:
+                    cut = len(chunk)
+                if cut:
+                    break
+                chunk_size *= 2
+
+            # Offsets and blank-line filtering stay inside C iterators, so
+            # the pass never holds more than one chunk of lines.
+            chunk = chunk[:cut]
+            lines = LINE_END.split(chunk) if b"\r" in chunk else chunk.split(b"\n")
+            offsets = accumulate(map((1).__add__, map(len, lines)), initial=pos)
+            if chunk.isascii():
+                kept = map(bytes.strip, lines)
+            else:
+                # bytes.strip only knows ASCII whitespace; lines holding just
+                # NBSP, U+3000 and the like must be dropped like str.strip would.
+                kept = map(str.strip, TEXT_LINE_END.split(chunk.decode(self.encoding)))
+            self.starts.extend(compress(offsets, kept))
+            pos += cut
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start = self.starts[index]
+        match = LINE_END.search(self._map, start)
+        end = match.start() if match else len(self._map)
+        return self._map[start:end].decode(self.encoding).strip()
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
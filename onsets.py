@@ -0,0 +1,157 @@
+import os
+
+import numpy as np
+
+from lyric_core import file_hash
+from waveform_cache import (
+    CACHE_DIR, build_pyramid, decode_audio, load_cached, save_pyramid
+)
+
+FRAME_SIZE = 2048
+HOP_SIZE = 512
+BATCH_FRAMES = 2048
+VOCAL_BAND = (250.0, 4000.0)
+MIN_GAP = 0.35
+ACTIVITY_WINDOW = 0.3
+SNAP_WINDOW = 0.15
+FORMAT_VERSION = 1
+
+
+def frame_features(samples, rate, frame_size=FRAME_SIZE, hop=HOP_SIZE):
+    """Per-frame RMS, spectral flux and vocal-band energy, computed in batches of frames."""
+    if len(samples) < frame_size:
+        samples = np.pad(samples, (0, frame_size - len(samples)))
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, frame_size)[::hop]
+    window = np.hanning(frame_size).astype(np.float32)
+    freqs = np.fft.rfftfreq(frame_size, 1.0 / rate)
+    band = (freqs >= VOCAL_BAND[0]) & (freqs <= VOCAL_BAND[1])
+
+    count = len(frames)
+    rms = np.empty(count, dtype=np.float32)
+    flux = np.empty(count, dtype=np.float32)
+    band_energy = np.empty(count, dtype=np.float32)
+    previous = None
+
+    for first in range(0, count, BATCH_FRAMES):
+        batch = frames[first:first + BATCH_FRAMES]
+        rms[first:first + len(batch)] = np.sqrt(np.mean(np.square(batch), axis=1))
+
+        spectrum = np.abs(np.fft.rfft(batch * window, axis=1)).astype(np.float32)
+        log_spectrum = np.log1p(100.0 * spectrum)
+        band_energy[first:first + len(batch)] = np.square(spectrum[:, band]).sum(axis=1)
+
+        if previous is None:
+            previous = log_spectrum[:1]
+        diff = np.diff(np.concatenate([previous, log_spectrum]), axis=0)
+        flux[first:first + len(batch)] = np.maximum(diff[:, band], 0).sum(axis=1)
+        previous = log_spectrum[-1:]
+
+    return rms, flux, band_energy
+
+
+def normalize(values):
+    spread = np.percentile(values, 95) - np.percentile(values, 5)
+    return (values - np.median(values)) / (spread if spread > 0 else 1.0)
+
+
+def detect_onsets(samples, rate, hop=HOP_SIZE, min_gap=MIN_GAP):
+    """Candidate line onsets as (times, strengths), sorted by time."""
+    rms, flux, band_energy = frame_features(samples, rate, hop=hop)
+    frame_time = hop / rate
+
+    # Vocal activity: band energy well above the track's quiet floor.
+    log_band = np.log1p(band_energy)
+    floor = np.percentile(log_band, 20)
+    active = (log_band > floor + 0.5 * (np.percentile(log_band, 90) - floor)).astype(np.float32)
+
+    # A line onset is a spectral change followed by sustained activity that
+    # was not there just before; clicks and line endings fail the second test.
+    span = max(1, int(ACTIVITY_WINDOW / frame_time))
+    totals = np.concatenate([np.zeros(span + 1), np.cumsum(active), np.full(span, active.sum())])
+    index = np.arange(len(active)) + span + 1
+    after = (totals[index + span - 1] - totals[index - 1]) / span
+    before = (totals[index - 1] - totals[index - span - 1]) / span
+
+    novelty = np.maximum(normalize(flux), 0) + 0.5 * np.maximum(np.diff(normalize(rms), prepend=0), 0)
+    strength = novelty * (0.25 + after) + 2.0 * np.maximum(after - before, 0)
+
+    # Peak picking: local maximum over +/- min_gap, above a moving-average threshold.
+    radius = max(1, int(min_gap / frame_time))
+    padded = np.pad(strength, radius, mode='edge')
+    local_max = np.lib.stride_tricks.sliding_window_view(padded, 2 * radius + 1).max(axis=1)
+    kernel = np.ones(4 * radius + 1, dtype=np.float32) / (4 * radius + 1)
+    threshold = np.convolve(strength, kernel, mode='same') + 0.1
+    peaks = np.flatnonzero((strength >= local_max) & (strength > threshold) & (after >= 0.5))
+
+    # Plateaus can produce neighbouring maxima; keep the first of each cluster.
+    if len(peaks):
+        keep = np.concatenate([[True], np.diff(peaks) > radius])
+        peaks = peaks[keep]
+
+    # Frames are stamped at their centre, where a new sound first dominates the window.
+    times = (peaks * hop + FRAME_SIZE / 2) / rate
+    return times.astype(np.float64), strength[peaks].astype(np.float64)
+
+
+def snap(t, onsets, window=SNAP_WINDOW):
+    """Nearest onset to t if one lies within window seconds, else t."""
+    if onsets is None or not len(onsets):
+        return t
+    i = int(np.searchsorted(onsets, t))
+    best = t
+    best_distance = window
+    for j in (i - 1, i):
+        if 0 <= j < len(onsets) and abs(onsets[j] - t) <= best_distance:
+            best = float(onsets[j])
+            best_distance = abs(onsets[j] - t)
+    return best
+
+
+def auto_draft(times, strengths, line_count, duration):
+    """Pick one onset per line: the strongest candidates, topped up evenly in the widest gaps."""
+    if line_count <= 0:
+        return []
+
+    if len(times) >= line_count:
+        chosen = np.sort(times[np.argsort(strengths)[::-1][:line_count]])
+        return chosen.tolist()
+
+    draft = list(times)
+    while len(draft) < line_count:
+        points = [0.0] + sorted(draft) + [duration]
+        gaps = np.diff(points)
+        widest = int(np.argmax(gaps))
+        draft.append(points[widest] + gaps[widest] / 2)
+    return sorted(draft)
+
+
+def onset_cache_path(digest, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{digest}.onsets.v{FORMAT_VERSION}.npy")
+
+
+def analyze(file_path, cache_dir=CACHE_DIR, digest=None):
+    """(PeakPyramid, onset times, onset strengths, duration), decoding the file at most once."""
+    digest = digest or file_hash(file_path)
+    pyramid = load_cached(digest, cache_dir)
+    onset_path = onset_cache_path(digest, cache_dir)
+
+    try:
+        onsets = np.load(onset_path)
+    except (OSError, ValueError):
+        onsets = None
+
+    if pyramid is None or onsets is None:
+        samples, rate = decode_audio(file_path)
+        if pyramid is None:
+            save_pyramid(digest, build_pyramid(samples), rate, len(samples), cache_dir)
+            pyramid = load_cached(digest, cache_dir)
+        if onsets is None:
+            onsets = np.vstack(detect_onsets(samples, rate))
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = onset_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, onsets)
+            os.replace(tmp_path, onset_path)
+
+    return pyramid, onsets[0], onsets[1], pyramid.duration
@@ -0,0 +1,168 @@
+import functools
+import json
+import os
+import threading
+import time
+from array import array
+
+from settings import SETTINGS_DIR
+
+PROFILE_DIR = os.path.join(SETTINGS_DIR, "profiles")
+CAPACITY = 4096
+STALL_TICK_MS = 20
+STALL_THRESHOLD_MS = 50
+STALL_SPAN = "tk_stall"
+
+
+class SpanRing:
+    """Last `capacity` spans of one name as (start_ns, duration_ns) in preallocated arrays."""
+
+    def __init__(self, name, capacity=CAPACITY):
+        self.name = name
+        self.capacity = capacity
+        self.starts = array('q', bytes(8 * capacity))
+        self.durations = array('q', bytes(8 * capacity))
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, start_ns, duration_ns):
+        i = self.count % self.capacity
+        self.starts[i] = start_ns
+        self.durations[i] = duration_ns
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def spans(self):
+        """Retained spans, oldest first."""
+        if self.count <= self.capacity:
+            return list(zip(self.starts[:self.count], self.durations[:self.count]))
+        i = self.count % self.capacity
+        return list(zip(self.starts[i:] + self.starts[:i], self.durations[i:] + self.durations[:i]))
+
+    def summary(self):
+        ordered = sorted(self.durations[:min(self.count, self.capacity)])
+
+        def percentile(p):
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] / 1e6
+
+        return {
+            "name": self.name,
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.total_ns / self.count / 1e6 if self.count else 0.0,
+            "p50_ms": percentile(50),
+            "p99_ms": percentile(99),
+            "max_ms": self.max_ns / 1e6,
+        }
+
+
+class Profiler:
+    """Opt-in span recorder for UI handlers and Tk event-loop stalls.
+
+    Methods are timed by wrapping them on the instance, so nothing is paid
+    unless profiling was switched on. Counts, totals and maxima cover the
+    whole run; percentiles and the trace cover the last CAPACITY spans of
+    each name.
+    """
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.rings = {}
+        self.origin_ns = time.perf_counter_ns()
+        self.thread_id = threading.get_ident()
+        self.stall_after = None
+
+    def ring(self, name):
+        ring = self.rings.get(name)
+        if ring is None:
+            ring = self.rings[name] = SpanRing(name, self.capacity)
+        return ring
+
+    def wrap(self, name, func):
+        add = self.ring(name).add
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(started, clock() - started)
+
+        return timed
+
+    def instrument(self, obj, names):
+        """Replace each named method of obj with a timed wrapper on the instance."""
+        for name in names:
+            setattr(obj, name, self.wrap(name, getattr(obj, name)))
+
+    def watch_event_loop(self, root, tick_ms=STALL_TICK_MS, threshold_ms=STALL_THRESHOLD_MS):
+        """Record a stall whenever a root.after heartbeat fires more than threshold_ms late."""
+        add = self.ring(STALL_SPAN).add
+        tick_ns = tick_ms * 1_000_000
+        threshold_ns = threshold_ms * 1_000_000
+        expected = time.perf_counter_ns() + tick_ns
+
+        def beat():
+            nonlocal expected
+            now = time.perf_counter_ns()
+            late = now - expected
+            if late > threshold_ns:
+                add(expected, late)
+            expected = now + tick_ns
+            self.stall_after = root.after(tick_ms, beat)
+
+        self.stall_after = root.after(tick_ms, beat)
+
+    def stop(self, root):
+        if self.stall_after is not None:
+            root.after_cancel(self.stall_after)
+            self.stall_after = None
+
+    def summary(self):
+        return [ring.summary() for ring in self.rings.values() if ring.count]
+
+    def summary_table(self):
+        header = f"{'span':<24}{'count':>8}{'total ms':>11}{'mean ms':>10}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        rows = [header, "-" * len(header)]
+        for s in sorted(self.summary(), key=lambda s: s["total_ms"], reverse=True):
+            rows.append(
+                f"{s['name']:<24}{s['count']:>8}{s['total_ms']:>11.2f}{s['mean_ms']:>10.3f}"
+                f"{s['p50_ms']:>9.3f}{s['p99_ms']:>9.3f}{s['max_ms']:>9.2f}"
+            )
+        return "\n".join(rows)
+
+    def trace_events(self):
+        pid = os.getpid()
+        events = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "lyrics timestamp generator"}},
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": self.thread_id, "args": {"name": "Tk main loop"}},
+        ]
+        for ring in self.rings.values():
+            category = "stall" if ring.name == STALL_SPAN else "handler"
+            for start_ns, duration_ns in ring.spans():
+                events.append({
+                    "name": ring.name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start_ns - self.origin_ns) / 1000,
+                    "dur": duration_ns / 1000,
+                    "pid": pid,
+                    "tid": self.thread_id,
+                })
+        return events
+
+    def export_trace(self, file_path):
+        """Chrome trace event JSON, loadable in chrome://tracing and ui.perfetto.dev."""
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+
+    def default_trace_path(self):
+        return os.path.join(PROFILE_DIR, time.strftime("trace-%Y%m%d-%H%M%S.json"))
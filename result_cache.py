@@ -0,0 +1,190 @@
+import difflib
+import hashlib
+import json
+import os
+
+from settings import SETTINGS_DIR
+
+CACHE_DIR = os.path.join(SETTINGS_DIR, "results")
+MAX_BYTES = 64 * 1024 * 1024
+FORMAT_VERSION = 1
+GAP_STEP = 2.0
+
+
+def normalize_line(line):
+    return " ".join(line.split()).casefold()
+
+
+def lyrics_hash(lyrics):
+    digest = hashlib.blake2b(digest_size=20)
+    for line in lyrics:
+        digest.update(normalize_line(line).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def entry_path(audio_digest, lyrics_digest, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{audio_digest}-{lyrics_digest}.json")
+
+
+def takes_path(audio_digest, lyrics_digest, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{audio_digest}-{lyrics_digest}.takes.jsonl")
+
+
+def load_entry(file_path):
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("version") != FORMAT_VERSION:
+        return None
+    return entry
+
+
+def store_result(audio_digest, lyrics, times, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    os.makedirs(cache_dir, exist_ok=True)
+    file_path = entry_path(audio_digest, lyrics_hash(lyrics), cache_dir)
+
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": FORMAT_VERSION,
+            "lines": [normalize_line(line) for line in lyrics],
+            "times": list(times),
+        }, f, separators=(",", ":"))
+    os.replace(tmp_path, file_path)
+
+    evict(cache_dir, max_bytes, keep=file_path)
+    return file_path
+
+
+def store_take(audio_digest, lyrics_digest, times, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """Append one take's line times to the takes file for this audio and lyrics."""
+    os.makedirs(cache_dir, exist_ok=True)
+    file_path = takes_path(audio_digest, lyrics_digest, cache_dir)
+    with open(file_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"version": FORMAT_VERSION, "times": list(times)}, separators=(",", ":")) + "\n")
+    evict(cache_dir, max_bytes, keep=file_path)
+    return file_path
+
+
+def load_takes(audio_digest, lyrics_digest, cache_dir=CACHE_DIR):
+    """Every stored take for this audio and lyrics, oldest first, as lists of seconds."""
+    takes = []
+    try:
+        with open(takes_path(audio_digest, lyrics_digest, cache_dir), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A crash mid-append tears one line; takes appended after it are still good.
+                    continue
+                if record.get("version") == FORMAT_VERSION:
+                    takes.append(record["times"])
+    except FileNotFoundError:
+        pass
+    return takes
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_BYTES, keep=None):
+    """Remove least recently used entries until the cache fits in max_bytes."""
+    entries = []
+    total = 0
+    with os.scandir(cache_dir) as it:
+        for item in it:
+            if item.name.endswith((".json", ".takes.jsonl")):
+                stat = item.stat()
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+                total += stat.st_size
+
+    for _, size, file_path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if file_path == keep:
+            continue
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def align_times(old_lines, old_times, new_lines):
+    """Times for new_lines, reusing old_times for lines the diff leaves unchanged (None elsewhere)."""
+    times = [None] * len(new_lines)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for old_first, new_first, size in matcher.get_matching_blocks():
+        times[new_first:new_first + size] = old_times[old_first:old_first + size]
+    return times
+
+
+def lookup_result(audio_digest, lyrics, cache_dir=CACHE_DIR):
+    """(times, reused) for lyrics on this audio, or None if nothing is known about it.
+
+    An exact hit returns every time. Otherwise the entry for the same audio
+    that shares the most lines is aligned against the new lyrics, and lines
+    without a match come back as None.
+    """
+    exact = entry_path(audio_digest, lyrics_hash(lyrics), cache_dir)
+    entry = load_entry(exact)
+    if entry is not None and len(entry["times"]) == len(lyrics):
+        os.utime(exact)
+        return entry["times"], len(lyrics)
+
+    try:
+        names = [
+            name for name in os.listdir(cache_dir) if name.startswith(audio_digest + "-") and name.endswith(".json")
+        ]
+    except FileNotFoundError:
+        return None
+
+    lines = [normalize_line(line) for line in lyrics]
+    best = None
+    for name in names:
+        file_path = os.path.join(cache_dir, name)
+        entry = load_entry(file_path)
+        if entry is None:
+            continue
+        times = align_times(entry["lines"], entry["times"], lines)
+        reused = sum(t is not None for t in times)
+        if reused and (best is None or reused > best[1]):
+            best = (times, reused, file_path)
+
+    if best is None:
+        return None
+    os.utime(best[2])
+    return best[0], best[1]
+
+
+def missing_ranges(times):
+    """(first, last) line ranges, inclusive, whose time is None."""
+    ranges = []
+    first = None
+    for i, t in enumerate(times):
+        if t is None and first is None:
+            first = i
+        elif t is not None and first is not None:
+            ranges.append((first, i - 1))
+            first = None
+    if first is not None:
+        ranges.append((first, len(times) - 1))
+    return ranges
+
+
+def fill_gaps(times, duration=None):
+    """Interpolate missing times evenly between their known neighbours."""
+    filled = list(times)
+    for first, last in missing_ranges(times):
+        before = filled[first - 1] if first > 0 else 0.0
+        count = last - first + 1
+        if last + 1 < len(filled):
+            after = filled[last + 1]
+        elif duration is not None and duration > before:
+            after = duration
+        else:
+            after = before + GAP_STEP * (count + 1)
+        step = (after - before) / (count + 1)
+        for k in range(count):
+            filled[first + k] = before + step * (k + 1)
+    return filled
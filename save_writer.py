@@ -0,0 +1,93 @@
+import queue
+import threading
+from collections import deque
+
+
+def chain_callbacks(first, second):
+    """One on_done that runs both callbacks, in submission order."""
+    if first is None:
+        return second
+    if second is None:
+        return first
+
+    def both(result, error):
+        first(result, error)
+        second(result, error)
+
+    return both
+
+
+class SaveWriter:
+    """Runs save jobs one at a time on a background thread.
+
+    Jobs are keyed: submitting under a key whose previous job hasn't started
+    yet replaces that job (optionally merging its arguments), so a burst of
+    saves costs one write. The replaced job's on_done still runs, after its
+    own. Results are queued for the Tk thread to pick up with completed().
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._order = deque()
+        self._busy = False
+        self._closed = False
+        self._done = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, func, *args, on_done=None, merge=None):
+        with self._cond:
+            if key in self._pending:
+                _, previous_args, previous_done = self._pending[key]
+                if merge is not None:
+                    args = merge(previous_args, args)
+                on_done = chain_callbacks(previous_done, on_done)
+            else:
+                self._order.append(key)
+            self._pending[key] = (func, args, on_done)
+            self._cond.notify_all()
+
+    @property
+    def idle(self):
+        with self._cond:
+            return not self._pending and not self._busy
+
+    def completed(self):
+        """(on_done, result, error) for every job finished since the last call."""
+        finished = []
+        while True:
+            try:
+                finished.append(self._done.get_nowait())
+            except queue.Empty:
+                return finished
+
+    def flush(self, timeout=None):
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout=None):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                func, args, on_done = self._pending.pop(self._order.popleft())
+                self._busy = True
+
+            result = error = None
+            try:
+                result = func(*args)
+            except Exception as e:
+                error = e
+            self._done.put((on_done, result, error))
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
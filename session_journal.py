@@ -0,0 +1,152 @@
+import json
+import os
+import queue
+import threading
+import time
+
+from lyric_core import lyrics_changed, resolve_lyrics
+from settings import SETTINGS_DIR
+
+JOURNAL_FILE = os.path.join(SETTINGS_DIR, "session.journal.jsonl")
+
+
+class SessionJournal:
+    """Append-only JSONL log of a recording session.
+
+    Records, and the open / close / discard of the file itself, are handed to
+    one writer thread in order. It appends records in batches and fsyncs once
+    per batch, so callers on the Tk thread never touch the disk or wait on it.
+    """
+
+    def __init__(self, file_path=JOURNAL_FILE, sync_interval=0.1):
+        self.file_path = file_path
+        self.sync_interval = sync_interval
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._open = False
+
+    def _command(self, *command):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="session-journal", daemon=True)
+            self._thread.start()
+        self._queue.put(command)
+
+    def open(self, header, times=()):
+        self._command("open", dict(header, type="start"), list(times))
+        self._open = True
+
+    def append(self, record):
+        if self._open:
+            self._queue.put(record)
+
+    def tap(self, line, t):
+        self.append({"type": "tap", "line": line, "t": t})
+
+    def undo(self, line):
+        self.append({"type": "undo", "line": line})
+
+    def close(self):
+        if self._open:
+            self._open = False
+            self._command("close")
+
+    def discard(self):
+        self._open = False
+        self._command("discard")
+
+    def shutdown(self, timeout=None):
+        """Close the file and wait for everything queued so far to reach the disk."""
+        self.close()
+        if self._thread is not None:
+            self._queue.put(("stop",))
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        f = None
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.sync_interval
+            while isinstance(batch[-1], dict):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            records = []
+            for item in batch:
+                if isinstance(item, dict):
+                    records.append(item)
+                    continue
+                self._write(f, records)
+                records = []
+                if f is not None:
+                    f.close()
+                    f = None
+
+                command = item[0]
+                if command == "open":
+                    os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+                    f = open(self.file_path, "w", encoding="utf-8")
+                    records = [item[1]] + [{"type": "tap", "line": line, "t": t} for line, t in enumerate(item[2])]
+                elif command == "discard":
+                    try:
+                        os.remove(self.file_path)
+                    except FileNotFoundError:
+                        pass
+                elif command == "stop":
+                    running = False
+            self._write(f, records)
+
+    def _write(self, f, records):
+        if f is None or not records:
+            return
+        f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_journal(file_path=JOURNAL_FILE):
+    try:
+        f = open(file_path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+    header = None
+    times = []
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash mid-write leaves at most one torn line at the end.
+                break
+
+            kind = record.get("type")
+            if kind == "start":
+                header = record
+            elif kind == "tap" and record["line"] <= len(times):
+                del times[record["line"]:]
+                times.append(record["t"])
+            elif kind == "undo":
+                del times[record["line"]:]
+
+    if header is None:
+        return None
+
+    try:
+        lyrics = resolve_lyrics(header)
+    except (OSError, UnicodeDecodeError):
+        return None
+    del times[len(lyrics):]
+    return {
+        "audio": header.get("audio", ""),
+        "lyrics": lyrics,
+        "times": times,
+        # Edited since the crash: the journaled times may no longer line up with the lines.
+        "lyrics_changed": lyrics_changed(header, lyrics),
+    }
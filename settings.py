@@ -0,0 +1,3 @@
+import os
+
+SETTINGS_DIR = os.environ.get("LYRICS_SETTINGS_DIR") or os.path.join(os.path.expanduser("~"), ".lyrics_timestamp_generator")
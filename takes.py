@@ -0,0 +1,93 @@
+from collections import namedtuple
+
+import numpy as np
+
+OUTLIER_SIGMAS = 3.0
+MIN_SPREAD = 0.02
+CONFIDENCE_SCALE = 0.05
+ITERATIONS = 3
+
+Consensus = namedtuple("Consensus", "times confidence inliers offsets slopes")
+
+
+def take_matrix(takes, line_count):
+    """(takes, lines) array from per-take lists of line times in seconds; lines a take never reached are NaN."""
+    matrix = np.full((len(takes), line_count), np.nan)
+    for row, times in zip(matrix, takes):
+        count = min(len(times), line_count)
+        row[:count] = times[:count]
+    return matrix
+
+
+def nanmedian(matrix):
+    """Column medians ignoring NaN; one sort instead of numpy's per-column nanmedian."""
+    ordered = np.sort(matrix, axis=0)
+    counts = (~np.isnan(matrix)).sum(axis=0)
+    low = np.maximum(counts - 1, 0) // 2
+    high = counts // 2 - (counts == 0)
+    columns = np.arange(matrix.shape[1])
+    median = (ordered[low, columns] + ordered[np.maximum(high, 0), columns]) / 2
+    return np.where(counts > 0, median, np.nan)
+
+
+def fit_drift(residuals, reference, weights):
+    """Per-take least-squares line residual ≈ offset + slope * reference, over weighted points."""
+    x = np.where(weights, reference, 0.0)
+    r = np.where(weights, residuals, 0.0)
+    n = weights.sum(axis=1)
+    sx, sr = x.sum(axis=1), r.sum(axis=1)
+    sxx, sxr = (x * x).sum(axis=1), (x * r).sum(axis=1)
+
+    denominator = n * sxx - sx * sx
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slopes = np.where(np.abs(denominator) > 1e-12, (n * sxr - sx * sr) / denominator, 0.0)
+        offsets = np.where(n > 0, (sr - slopes * sx) / n, 0.0)
+    return offsets, slopes
+
+
+def consensus(matrix, iterations=ITERATIONS, sigmas=OUTLIER_SIGMAS):
+    """Merge takes into one timing.
+
+    Each take is first corrected for its own drift (a constant reaction
+    offset plus a linear tempo term, fitted against the current consensus),
+    then every line takes the mean of the corrected taps within `sigmas`
+    robust standard deviations of that line's median.
+    """
+    present = ~np.isnan(matrix)
+    inliers = present.copy()
+    offsets = np.zeros(len(matrix))
+    slopes = np.zeros(len(matrix))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        reference = nanmedian(matrix)
+
+        for _ in range(iterations):
+            if len(matrix) > 1:
+                offsets, slopes = fit_drift(matrix - reference, reference, inliers & ~np.isnan(reference))
+                # Drift is relative: keep the consensus anchored to the takes' median offset.
+                offsets -= np.median(offsets)
+                slopes -= np.median(slopes)
+            corrected = matrix - (offsets[:, None] + slopes[:, None] * reference)
+
+            median = nanmedian(corrected)
+            deviation = np.abs(corrected - median)
+            spread = np.maximum(1.4826 * nanmedian(deviation), MIN_SPREAD)
+            inliers = present & (deviation <= sigmas * spread)
+
+            counts = inliers.sum(axis=0)
+            kept = np.where(inliers, corrected, 0.0)
+            reference = np.where(counts > 0, kept.sum(axis=0) / np.maximum(counts, 1), median)
+
+        std = np.sqrt((np.where(inliers, corrected - reference, 0.0) ** 2).sum(axis=0) / np.maximum(counts, 1))
+
+    available = present.sum(axis=0)
+    confidence = np.where(
+        counts > 0,
+        counts / np.maximum(available, 1) * np.exp(-std / CONFIDENCE_SCALE) * counts / (counts + 1),
+        0.0
+    )
+    return Consensus(reference, confidence, inliers, offsets, slopes)
+
+
+def merge_takes(takes, line_count):
+    return consensus(take_matrix(takes, line_count))
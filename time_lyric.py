@@ -1,30 +1,120 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import json
-import time
+import math
 import os
-from pygame import mixer
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lyric_core import TimingSession, WordTimingSession, file_hash, parse_lyrics, load_lyrics, lyrics_reference
+from exporters import EXPORTERS, export_many, strip_extension
+from audio_clock import AudioClock, device_key, load_latency, save_latency, make_click_track, estimate_latency
+from session_journal import SessionJournal, load_journal
+from json_viewer import JsonEntryViewer
+from ui_scheduler import RefreshScheduler
+from input_latency import EventClock, TapLatency
+from result_cache import fill_gaps, load_takes, lookup_result, lyrics_hash, missing_ranges, store_result, store_take
+from save_writer import SaveWriter
+from profiler import Profiler
+
+RESUME_PREROLL = 3.0
+PUNCH_IN_PREROLL = 3.0
+OUTPUT_STEM = "timestamps"
+TEXT_INPUT_CLASSES = ('Entry', 'Text', 'Spinbox', 'TEntry', 'TSpinbox', 'TCombobox')
+REDRAW_ALL = ('status', 'line', 'progress')
+CLOCK_TICK_MS = 50
+TELEPROMPTER_CONTEXT = 3
+LOW_CONFIDENCE = 0.3
+PROFILED_METHODS = (
+    'next_line', 'update_status', 'display_current_line', 'update_progress', 'save_timestamps', 'update_json_tab'
+)
+
+
+def open_mixer():
+    from pygame import mixer
+    if not mixer.get_init():
+        mixer.init()
+    return mixer
+
+
+def cache_result(digest, lyrics, timestamps):
+    return store_result(digest, lyrics, [timestamps.time(i) for i in range(len(timestamps))])
+
+
+def load_recorded_takes(audio_hash, lyrics):
+    digest = lyrics_hash(lyrics)
+    return digest, load_takes(audio_hash, digest)
+
+
+def merge_recorded_takes(takes, line_count):
+    from takes import merge_takes
+    return merge_takes(takes, line_count)
+
+
+def catalog_result(name, timestamps, audio, audio_hash):
+    from catalog import Catalog
+    with Catalog() as catalog:
+        catalog.add_timestamps(name, timestamps, audio, audio_hash)
+
+
+def merge_exports(pending, new):
+    # (timestamps, targets, first, generation): a coalesced save must still
+    # rewrite from the earliest line either request changed.
+    return new[:2] + (min(pending[2], new[2]),) + new[3:]
+
+
+def analyze_audio(file_path, digest=None):
+    import onsets
+    return onsets.analyze(file_path, digest=digest)
+
+
+def snap_to_onset(t, onset_times):
+    from onsets import snap
+    return snap(t, onset_times)
+
+
+def draft_from_onsets(onset_times, onset_strengths, line_count, duration):
+    from onsets import auto_draft
+    return auto_draft(onset_times, onset_strengths, line_count, duration)
 
 
 class LyricsTimestampGenerator:
-    def __init__(self, root):
+    def __init__(self, root, profiler=None):
         self.root = root
         self.root.title("🎵 Advanced Lyrics Timestamp Generator 🎵")
         self.root.geometry("1200x900")
         self.root.configure(bg='#0f1a2b')
         self.root.resizable(True, True)
 
-        mixer.init()
+        self.mixer = None
+        self.device_key = None
+        self.latency_ms = 0.0
 
         # App state
-        self.current_line = 0
-        self.recording = False
-        self.start_time = 0
-        self.timestamps = []
+        self.session = TimingSession([])
         self.audio_loaded = False
         self.lyrics = []
         self.selected_audio_file = ""
-        self.json_output = ""
+        self.audio_hash = None
+        self.export_targets = {}
+        self.export_offsets = {}
+        # Bumped whenever self.session is replaced; files on disk are only
+        # patched in place when they were last written by the same session.
+        self.session_generation = 0
+        self.export_generation = None
+        self.waveform = None
+        self.waveform_view = (0.0, 0.0)
+        self.onset_times = None
+        self.onset_strengths = None
+        # Recorded takes of the current audio and lyrics, persisted next to the result cache.
+        self.takes = []
+        self.takes_audio = None
+        self.takes_lyrics = None
+        self.takes_digest = None
+        self.background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="background")
+        self.writer = SaveWriter()
+        self.watching_writer = False
 
         # Colors
         self.bg_color = '#0f1a2b'
@@ -37,11 +127,43 @@ class LyricsTimestampGenerator:
         self.error = '#ef4444'
         self.text_color = '#f8fafc'
         self.text_secondary = '#cbd5e1'
+        self.text_muted = '#64748b'
         self.json_bg = '#000000'
         self.json_text = '#ffffff'
 
+        self.journal = SessionJournal()
+        self.event_clock = EventClock()
+        self.tap_latency = TapLatency()
+
+        # Wrapped before anything captures the bound methods (scheduler, buttons).
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.instrument(self, PROFILED_METHODS)
+            profiler.watch_event_loop(self.root)
+
+        self.refresh = RefreshScheduler(self.root)
+        self.refresh.register('status', self.update_status)
+        self.refresh.register('line', self.display_current_line)
+        self.refresh.register('progress', self.update_progress)
+
         self.setup_ui()
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.setup_hotkeys()
+        self.root.after(100, self.offer_resume)
+
+    @property
+    def current_line(self):
+        return self.session.current_line
+
+    @property
+    def recording(self):
+        return self.session.recording
+
+    @property
+    def timestamps(self):
+        return self.session.timestamps
+
     def setup_ui(self):
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -53,9 +175,10 @@ class LyricsTimestampGenerator:
 
         self.notebook.add(self.main_tab, text="🎵 Main")
         self.notebook.add(self.json_tab, text="📋 JSON Output")
+        self.json_tab_built = False
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
         self.setup_main_tab()
-        self.setup_json_tab()
 
     def setup_styles(self):
         style = ttk.Style()
@@ -104,6 +227,15 @@ class LyricsTimestampGenerator:
 
         self.create_main_ui_elements()
 
+    def _on_tab_changed(self, event):
+        if self.notebook.select() == str(self.json_tab):
+            self.ensure_json_tab()
+
+    def ensure_json_tab(self):
+        if not self.json_tab_built:
+            self.json_tab_built = True
+            self.setup_json_tab()
+
     def setup_json_tab(self):
         json_container = tk.Frame(self.json_tab, bg=self.bg_color)
         json_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -126,22 +258,14 @@ class LyricsTimestampGenerator:
         )
         self.json_info_label.pack(pady=(0, 10))
 
-        json_display_frame = tk.Frame(json_container, bg=self.bg_color)
-        json_display_frame.pack(fill=tk.BOTH, expand=True)
-
-        self.json_display = scrolledtext.ScrolledText(
-            json_display_frame,
-            font=('Consolas', 12),
+        self.json_display = JsonEntryViewer(
+            json_container,
             bg=self.json_bg,
             fg=self.json_text,
-            wrap=tk.WORD,
-            relief='flat',
-            padx=15,
-            pady=15,
-            insertbackground=self.text_color
+            accent=self.accent,
+            secondary=self.text_secondary
         )
         self.json_display.pack(fill=tk.BOTH, expand=True)
-        self.json_display.config(state=tk.DISABLED)
 
     def create_main_ui_elements(self):
         self.scrollable_frame.grid_columnconfigure(0, weight=1)
@@ -204,6 +328,12 @@ class LyricsTimestampGenerator:
         )
         self.audio_label.pack(side='left', fill='x', expand=True)
 
+        self.waveform_canvas = tk.Canvas(frame, height=90, bg=self.bg_color, highlightthickness=0)
+        self.waveform_canvas.pack(fill='x', padx=20, pady=(0, 15))
+        self.waveform_canvas.bind("<Configure>", lambda e: self.draw_waveform())
+        self.waveform_canvas.bind("<MouseWheel>", self._on_waveform_zoom)
+        self.waveform_canvas.bind("<Double-Button-1>", lambda e: self.reset_waveform_zoom())
+
     def create_lyrics_input_section(self):
         frame = tk.Frame(self.scrollable_frame, bg=self.card_bg, relief='ridge', bd=2)
         frame.grid(row=2, column=0, sticky='ew', pady=(0, 20))
@@ -230,7 +360,11 @@ class LyricsTimestampGenerator:
             command=self.show_manual_input
         ).pack(side='left')
 
-        self.manual_input_frame = tk.Frame(frame, bg=self.card_bg)
+        self.lyrics_input_frame = frame
+        self.manual_input_frame = None
+
+    def build_manual_input(self):
+        self.manual_input_frame = tk.Frame(self.lyrics_input_frame, bg=self.card_bg)
 
         tk.Label(
             self.manual_input_frame,
@@ -283,7 +417,17 @@ class LyricsTimestampGenerator:
             bg=self.card_bg,
             justify='left'
         )
-        self.status_label.pack(fill='x', padx=20, pady=(0, 15))
+        self.status_label.pack(fill='x', padx=20, pady=(0, 5))
+
+        self.save_status_label = tk.Label(
+            frame,
+            text="",
+            font=('Arial', 10),
+            fg=self.text_secondary,
+            bg=self.card_bg,
+            justify='left'
+        )
+        self.save_status_label.pack(fill='x', padx=20, pady=(0, 15))
 
     def create_lyrics_display_section(self):
         frame = tk.Frame(self.scrollable_frame, bg=self.card_bg, relief='ridge', bd=2)
@@ -297,20 +441,46 @@ class LyricsTimestampGenerator:
         container = tk.Frame(frame, bg=self.card_bg)
         container.pack(fill='x', padx=20, pady=(0, 15))
 
+        # Teleprompter: a fixed pool of labels for the lines around the current
+        # one. Taps only change their text, so redraw cost doesn't grow with the lyrics.
+        self.previous_line_labels = [
+            self.teleprompter_label(container, self.text_muted) for _ in range(TELEPROMPTER_CONTEXT)
+        ]
+
         self.current_lyrics_display = tk.Text(
             container,
             font=('Arial', 18, 'bold'),
             bg=self.card_bg,
             fg=self.accent,
             wrap=tk.WORD,
-            height=3,
+            height=2,
             relief='flat',
             padx=20,
-            pady=20
+            pady=10
         )
         self.current_lyrics_display.pack(fill='x')
+        self.current_lyrics_display.tag_configure("center", justify='center')
+        self.current_lyrics_display.tag_configure("word", foreground=self.text_color, background=self.primary)
         self.current_lyrics_display.config(state=tk.DISABLED)
 
+        self.next_line_labels = [
+            self.teleprompter_label(container, self.text_color if i == 0 else self.text_secondary)
+            for i in range(TELEPROMPTER_CONTEXT)
+        ]
+        container.bind('<Configure>', self.wrap_teleprompter)
+
+    def teleprompter_label(self, parent, fg):
+        label = tk.Label(
+            parent, text="", font=('Arial', 13), fg=fg, bg=self.card_bg,
+            justify='center', anchor='center'
+        )
+        label.pack(fill='x')
+        return label
+
+    def wrap_teleprompter(self, event):
+        for label in self.previous_line_labels + self.next_line_labels:
+            self.refresh.configure(label, wraplength=max(event.width - 40, 100))
+
     def create_control_section(self):
         frame = tk.Frame(self.scrollable_frame, bg=self.card_bg, relief='ridge', bd=2)
         frame.grid(row=5, column=0, sticky='ew', pady=(0, 20))
@@ -351,10 +521,226 @@ class LyricsTimestampGenerator:
             bd=4,
             width=18,
             height=2,
+            state='disabled'
+        )
+        self.next_btn.pack(side='left', padx=(0, 15))
+        self.next_btn.bind('<ButtonPress-1>', self._on_next_button)
+
+        self.undo_btn = tk.Button(
+            center,
+            text="↩️ UNDO",
+            font=('Arial', 12, 'bold'),
+            bg=self.primary,
+            fg=self.text_color,
+            relief='raised',
+            bd=4,
+            width=10,
+            height=2,
+            state='disabled',
+            command=self.undo_line
+        )
+        self.undo_btn.pack(side='left')
+
+        tk.Label(
+            container,
+            text="Hotkeys: SPACE / ENTER = next line, BACKSPACE / Ctrl+Z = undo",
+            font=('Arial', 10),
+            fg=self.text_secondary,
+            bg=self.card_bg
+        ).pack(pady=(10, 0))
+
+        calibration_row = tk.Frame(container, bg=self.card_bg)
+        calibration_row.pack(pady=(15, 0))
+
+        self.calibrate_btn = tk.Button(
+            calibration_row,
+            text="🎯 Calibrate Latency",
+            font=('Arial', 10, 'bold'),
+            bg=self.primary,
+            fg=self.text_color,
+            relief='raised',
+            bd=3,
+            width=18,
+            height=1,
+            command=self.calibrate_latency
+        )
+        self.calibrate_btn.pack(side='left', padx=(0, 15))
+
+        self.latency_label = tk.Label(
+            calibration_row,
+            text="Output latency: loads with the first audio file",
+            font=('Arial', 10),
+            fg=self.text_secondary,
+            bg=self.card_bg
+        )
+        self.latency_label.pack(side='left', padx=(0, 15))
+
+        tk.Button(
+            calibration_row,
+            text="📊 Tap Latency",
+            font=('Arial', 10, 'bold'),
+            bg=self.primary,
+            fg=self.text_color,
+            relief='raised',
+            bd=3,
+            width=14,
+            height=1,
+            command=self.show_tap_latency
+        ).pack(side='left')
+
+        onset_row = tk.Frame(container, bg=self.card_bg)
+        onset_row.pack(pady=(15, 0))
+
+        self.word_mode_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            onset_row,
+            text="🔤 Word timing (one tap per word)",
+            variable=self.word_mode_var,
+            font=('Arial', 10),
+            fg=self.text_color,
+            bg=self.card_bg,
+            selectcolor=self.bg_color,
+            activebackground=self.card_bg,
+            activeforeground=self.text_color
+        ).pack(side='left', padx=(0, 15))
+
+        self.snap_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            onset_row,
+            text="🧲 Snap taps to detected onsets",
+            variable=self.snap_var,
+            font=('Arial', 10),
+            fg=self.text_color,
+            bg=self.card_bg,
+            selectcolor=self.bg_color,
+            activebackground=self.card_bg,
+            activeforeground=self.text_color
+        ).pack(side='left', padx=(0, 15))
+
+        self.draft_btn = tk.Button(
+            onset_row,
+            text="🤖 Auto-draft",
+            font=('Arial', 10, 'bold'),
+            bg=self.primary,
+            fg=self.text_color,
+            relief='raised',
+            bd=3,
+            width=14,
+            height=1,
+            state='disabled',
+            command=self.auto_draft
+        )
+        self.draft_btn.pack(side='left', padx=(0, 15))
+
+        self.merge_btn = tk.Button(
+            onset_row,
+            text="🧮 Merge Takes",
+            font=('Arial', 10, 'bold'),
+            bg=self.primary,
+            fg=self.text_color,
+            relief='raised',
+            bd=3,
+            width=14,
+            height=1,
             state='disabled',
-            command=self.next_line
+            command=self.merge_takes
         )
-        self.next_btn.pack(side='left')
+        self.merge_btn.pack(side='left', padx=(0, 10))
+
+        self.takes_label = tk.Label(
+            onset_row,
+            text="Takes: 0",
+            font=('Arial', 10),
+            fg=self.text_secondary,
+            bg=self.card_bg
+        )
+        self.takes_label.pack(side='left')
+
+        punch_row = tk.Frame(container, bg=self.card_bg)
+        punch_row.pack(pady=(15, 0))
+
+        tk.Label(
+            punch_row,
+            text="✂️ Re-record lines",
+            font=('Arial', 10, 'bold'),
+            fg=self.text_color,
+            bg=self.card_bg
+        ).pack(side='left', padx=(0, 10))
+
+        self.punch_from_var = tk.StringVar(value="1")
+        self.punch_to_var = tk.StringVar(value="1")
+        for label, var in (("from", self.punch_from_var), ("to", self.punch_to_var)):
+            tk.Label(punch_row, text=label, font=('Arial', 10), fg=self.text_secondary, bg=self.card_bg).pack(side='left')
+            tk.Spinbox(
+                punch_row, from_=1, to=1_000_000, width=6, textvariable=var, font=('Arial', 10)
+            ).pack(side='left', padx=(5, 10))
+
+        self.punch_btn = tk.Button(
+            punch_row,
+            text="🎯 PUNCH IN",
+            font=('Arial', 10, 'bold'),
+            bg='#dc2626',
+            fg=self.text_color,
+            relief='raised',
+            bd=3,
+            width=14,
+            height=1,
+            state='disabled',
+            command=self.punch_in
+        )
+        self.punch_btn.pack(side='left')
+
+        formats_row = tk.Frame(container, bg=self.card_bg)
+        formats_row.pack(pady=(15, 0))
+
+        tk.Label(
+            formats_row,
+            text="💾 Export formats:",
+            font=('Arial', 10, 'bold'),
+            fg=self.text_color,
+            bg=self.card_bg
+        ).pack(side='left', padx=(0, 10))
+
+        self.export_vars = {}
+        for name, exporter in EXPORTERS.items():
+            var = tk.BooleanVar(value=name == "json")
+            tk.Checkbutton(
+                formats_row,
+                text=exporter.label,
+                variable=var,
+                font=('Arial', 10),
+                fg=self.text_color,
+                bg=self.card_bg,
+                selectcolor=self.bg_color,
+                activebackground=self.card_bg,
+                activeforeground=self.text_color
+            ).pack(side='left', padx=(0, 8))
+            self.export_vars[name] = var
+
+        output_row = tk.Frame(container, bg=self.card_bg)
+        output_row.pack(pady=(10, 0))
+
+        tk.Label(
+            output_row,
+            text="📁 Save to:",
+            font=('Arial', 10, 'bold'),
+            fg=self.text_color,
+            bg=self.card_bg
+        ).pack(side='left', padx=(0, 10))
+
+        self.output_var = tk.StringVar(value=os.path.abspath(OUTPUT_STEM))
+        tk.Entry(output_row, textvariable=self.output_var, width=50, font=('Arial', 10)).pack(side='left', padx=(0, 10))
+
+        tk.Button(
+            output_row,
+            text="Browse…",
+            font=('Arial', 10, 'bold'),
+            bg=self.primary,
+            fg=self.text_color,
+            relief='raised',
+            bd=3,
+            command=self.choose_output_path
+        ).pack(side='left')
 
     def create_progress_section(self):
         frame = tk.Frame(self.scrollable_frame, bg=self.card_bg, relief='ridge', bd=2)
@@ -395,6 +781,10 @@ class LyricsTimestampGenerator:
             filetypes=[("Audio Files", "*.mp3 *.wav *.ogg *.m4a"), ("All Files", "*.*")]
         )
 
+        if file_path:
+            self.load_audio_file(file_path)
+
+    def load_audio_file(self, file_path):
         if file_path:
             self.selected_audio_file = file_path
             filename = os.path.basename(file_path)
@@ -403,15 +793,122 @@ class LyricsTimestampGenerator:
             self.audio_label.config(text=f"✓ {display_name}", fg=self.success)
 
             try:
-                mixer.music.load(file_path)
+                self.ensure_mixer()
+                self.mixer.music.load(file_path)
                 self.audio_loaded = True
-                self.update_status()
+                self.refresh.mark('status')
+                self.hash_audio(file_path)
 
             except:
                 messagebox.showerror("Error", "Failed to load audio file")
                 self.audio_label.config(text="✗ Error loading file", fg=self.error)
                 self.audio_loaded = False
 
+    def ensure_mixer(self):
+        if self.mixer is None:
+            self.mixer = open_mixer()
+            self.device_key = device_key(self.mixer.get_init())
+            self.latency_ms = load_latency(self.device_key)
+            self.latency_label.config(text=f"Output latency: {self.latency_ms:.1f} ms")
+        return self.mixer
+
+    def run_in_background(self, func, callback, *args):
+        future = self.background.submit(func, *args)
+
+        def poll():
+            if future.done():
+                callback(future)
+            else:
+                self.root.after(50, poll)
+
+        self.root.after(50, poll)
+
+    def hash_audio(self, file_path):
+        self.audio_hash = None
+
+        def hashed(future):
+            if file_path != self.selected_audio_file:
+                return
+            try:
+                self.audio_hash = future.result()
+            except OSError:
+                self.load_waveform(file_path)
+                return
+            self.restore_cached_timing()
+            self.load_waveform(file_path, self.audio_hash)
+
+        self.run_in_background(file_hash, hashed, file_path)
+
+    def load_waveform(self, file_path, digest=None):
+        self.waveform = None
+        self.onset_times = self.onset_strengths = None
+        self.draw_waveform()
+        self.refresh.mark('status')
+
+        def loaded(future):
+            if file_path != self.selected_audio_file:
+                return
+            try:
+                self.waveform, self.onset_times, self.onset_strengths, _ = future.result()
+            except Exception:
+                self.waveform = None
+                return
+            self.reset_waveform_zoom()
+            self.refresh.mark('status')
+
+        self.run_in_background(analyze_audio, loaded, file_path, digest)
+
+    def reset_waveform_zoom(self):
+        if self.waveform is not None:
+            self.waveform_view = (0.0, self.waveform.duration)
+            self.draw_waveform()
+
+    def draw_waveform(self):
+        canvas = self.waveform_canvas
+        canvas.delete('all')
+        if self.waveform is None:
+            return
+
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        if width < 2:
+            return
+
+        start, end = self.waveform_view
+        low, high, rms = self.waveform.peaks(start, end, width)
+        mid = height / 2
+        xs = range(width)
+
+        peak_points = [v for x, y in zip(xs, high) for v in (x, mid - y * mid)]
+        peak_points += [v for x, y in zip(reversed(xs), low[::-1]) for v in (x, mid - y * mid)]
+        rms_points = [v for x, y in zip(xs, rms) for v in (x, mid - y * mid)]
+        rms_points += [v for x, y in zip(reversed(xs), rms[::-1]) for v in (x, mid + y * mid)]
+
+        canvas.create_polygon(peak_points, fill=self.secondary, outline='')
+        canvas.create_polygon(rms_points, fill=self.primary, outline='')
+
+        if self.onset_times is not None:
+            scale = width / max(end - start, 1e-9)
+            for t in self.onset_times[(self.onset_times >= start) & (self.onset_times <= end)][:width]:
+                x = (t - start) * scale
+                canvas.create_line(x, 0, x, height, fill=self.accent)
+        canvas.create_text(
+            6, 4, anchor='nw', fill=self.text_secondary, font=('Arial', 9),
+            text=f"{start:.1f}s – {end:.1f}s"
+        )
+
+    def _on_waveform_zoom(self, event):
+        if self.waveform is None:
+            return
+        start, end = self.waveform_view
+        anchor = start + (end - start) * event.x / max(1, self.waveform_canvas.winfo_width())
+        factor = 0.5 if event.delta > 0 else 2.0
+        span = min(self.waveform.duration, max(0.05, (end - start) * factor))
+        start = min(max(0.0, anchor - (anchor - start) * span / (end - start)), self.waveform.duration - span)
+        self.waveform_view = (start, start + span)
+        self.draw_waveform()
+        return 'break'
+
     def upload_lyrics_file(self):
         file_path = filedialog.askopenfilename(
             title="Select Lyrics File",
@@ -420,29 +917,30 @@ class LyricsTimestampGenerator:
 
         if file_path:
             try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    self.lyrics = [line.strip() for line in f if line.strip()]
+                self.lyrics = load_lyrics(file_path)
 
-                self.update_status()
-                self.display_current_line()
+                self.refresh.mark(*REDRAW_ALL)
                 messagebox.showinfo("Success", f"Loaded {len(self.lyrics)} lines from file")
+                self.restore_cached_timing()
 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load lyrics file: {str(e)}")
                 self.lyrics = []
 
     def show_manual_input(self):
+        if self.manual_input_frame is None:
+            self.build_manual_input()
         self.manual_input_frame.pack(fill='x', pady=(10, 0))
         self.lyrics_text_input.delete(1.0, tk.END)
 
     def save_manual_lyrics(self):
         text_content = self.lyrics_text_input.get(1.0, tk.END).strip()
         if text_content:
-            self.lyrics = [line.strip() for line in text_content.split('\n') if line.strip()]
+            self.lyrics = parse_lyrics(text_content)
             self.manual_input_frame.pack_forget()
-            self.update_status()
-            self.display_current_line()
+            self.refresh.mark(*REDRAW_ALL)
             messagebox.showinfo("Success", f"Saved {len(self.lyrics)} lines from manual input")
+            self.restore_cached_timing()
         else:
             messagebox.showwarning("Warning", "Please enter some lyrics text")
 
@@ -450,128 +948,700 @@ class LyricsTimestampGenerator:
         if not self.audio_loaded or not self.lyrics:
             status_text = "Please upload audio file and add lyrics to begin"
             status_color = self.text_secondary
-            self.start_btn.config(state='disabled')
-            self.next_btn.config(state='disabled')
+            start_state, next_state = 'disabled', 'disabled'
+
+        elif self.session.punching:
+            elapsed = self.session.elapsed()
+            status_text = (
+                f"✂️ Punch-in... {elapsed:.2f}s | Line {self.current_line + 1} "
+                f"(re-recording {self.session.punch_first + 1}–{self.session.punch_last + 1})"
+            )
+            status_color = self.error
+            start_state, next_state = 'disabled', 'normal'
 
         elif not self.recording:
             status_text = f"Ready! Audio loaded and {len(self.lyrics)} lyrics lines ready. Click START RECORDING!"
             status_color = self.success
-            self.start_btn.config(state='normal')
-            self.next_btn.config(state='disabled')
+            start_state, next_state = 'normal', 'disabled'
 
         else:
-            elapsed = time.time() - self.start_time
+            elapsed = self.session.elapsed()
             status_text = f"⏱️ Recording... {elapsed:.2f}s | Line {self.current_line + 1} of {len(self.lyrics)}"
+            if isinstance(self.session, WordTimingSession):
+                status_text += f" | Word {self.session.current_word + 1}"
             status_color = self.accent
-            self.start_btn.config(state='disabled')
-            self.next_btn.config(state='normal')
-
-        self.status_label.config(text=status_text, fg=status_color)
-        self.update_progress()
+            start_state, next_state = 'disabled', 'normal'
+
+        self.refresh.configure(self.start_btn, state=start_state)
+        self.refresh.configure(self.next_btn, state=next_state)
+        self.refresh.configure(self.undo_btn, state='normal' if self.recording and self.current_line else 'disabled')
+        self.refresh.configure(
+            self.punch_btn,
+            state='normal' if self.audio_loaded and self.timestamps and not self.recording else 'disabled'
+        )
+        self.refresh.configure(
+            self.merge_btn,
+            state='normal' if len(self.current_takes()) >= 2 and not self.recording else 'disabled'
+        )
+        self.refresh.configure(self.takes_label, text=f"Takes: {len(self.current_takes())}")
+        self.refresh.configure(
+            self.draft_btn,
+            state='normal' if self.onset_times is not None and self.lyrics and not self.recording else 'disabled'
+        )
+        self.refresh.configure(self.status_label, text=status_text, fg=status_color)
 
     def display_current_line(self):
+        self.display_context_lines()
         self.current_lyrics_display.config(state='normal')
         self.current_lyrics_display.delete(1.0, 'end')
 
         if self.current_line < len(self.lyrics):
             text = self.lyrics[self.current_line]
             self.current_lyrics_display.insert(1.0, text)
+            if isinstance(self.session, WordTimingSession) and self.recording:
+                for i, match in enumerate(re.finditer(r'\S+', text)):
+                    if i == self.session.current_word:
+                        self.current_lyrics_display.tag_add(
+                            "word", f"1.0 + {match.start()} chars", f"1.0 + {match.end()} chars"
+                        )
+                        break
         else:
             self.current_lyrics_display.insert(1.0, "🎉 All lines completed!\nSwitching to JSON Output...")
 
-        self.current_lyrics_display.tag_configure("center", justify='center')
         self.current_lyrics_display.tag_add("center", "1.0", "end")
-
         self.current_lyrics_display.config(state=tk.DISABLED)
-        self.update_progress()
+
+    def display_context_lines(self):
+        """Shift the lines around the current one through the label pool."""
+        count = len(self.lyrics)
+        first = self.current_line - len(self.previous_line_labels)
+        for i, label in enumerate(self.previous_line_labels):
+            index = first + i
+            self.refresh.configure(label, text=self.lyrics[index] if 0 <= index < count else "")
+        for i, label in enumerate(self.next_line_labels):
+            index = self.current_line + 1 + i
+            self.refresh.configure(label, text=self.lyrics[index] if index < count else "")
 
     def update_progress(self):
         if self.lyrics:
             progress = (self.current_line / len(self.lyrics)) * 100
-            self.progress_var.set(progress)
-            self.progress_label.config(
-                text=f"{self.current_line}/{len(self.lyrics)} lines completed ({int(progress)}%)"
-            )
+            text = f"{self.current_line}/{len(self.lyrics)} lines completed ({int(progress)}%)"
         else:
-            self.progress_var.set(0)
-            self.progress_label.config(text="0/0 lines completed (0%)")
+            progress = 0
+            text = "0/0 lines completed (0%)"
+
+        if self.progress_var.get() != progress:
+            self.progress_var.set(progress)
+        self.refresh.configure(self.progress_label, text=text)
 
     def start_recording(self):
         if not self.audio_loaded or not self.lyrics:
             messagebox.showerror("Error", "Load audio and lyrics first")
             return
 
-        self.recording = True
-        self.start_time = time.time()
-        self.timestamps = []
-        self.current_line = 0
+        self.begin_session()
+
+    def replace_session(self, session):
+        self.session = session
+        self.session_generation += 1
+
+    def begin_session(self, times=()):
+        self.audio_clock = AudioClock(self.mixer.music.get_pos, self.latency_ms)
+        # A resumed take only has line times in its journal, so it continues line by line.
+        session_class = WordTimingSession if self.word_mode_var.get() and not times else TimingSession
+        self.replace_session(session_class(self.lyrics, clock=self.audio_clock.position, on_tap=self.journal.tap))
+        start = max(0.0, times[-1] - RESUME_PREROLL) if times else 0.0
 
         try:
-            mixer.music.play()
-            self.update_status()
-            self.display_current_line()
+            self.mixer.music.play(start=start)
+            self.audio_clock.start(offset=start)
+            self.session.resume(times, now=0.0)
+            self.journal.open(dict(lyrics_reference(self.lyrics), audio=self.selected_audio_file), times)
+            self.refresh.mark(*REDRAW_ALL)
+            self.refresh.start_ticker('status', CLOCK_TICK_MS)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to play audio: {str(e)}")
-            self.recording = False
-            self.update_status()
+            self.session.stop()
+            self.refresh.mark('status')
+
+    def auto_draft(self):
+        if self.recording or self.onset_times is None or not self.lyrics:
+            return
+
+        if self.timestamps and not messagebox.askyesno(
+            "Auto-draft", "Replace the current timestamps with a draft from the detected onsets?"
+        ):
+            return
+
+        times = draft_from_onsets(self.onset_times, self.onset_strengths, len(self.lyrics), self.waveform.duration)
+        self.replace_session(TimingSession(self.lyrics))
+        self.session.replay(times)
+        self.refresh.mark(*REDRAW_ALL)
+
+        self.save_timestamps()
+        self.notebook.select(1)
+        self.update_json_tab()
+
+    def load_takes(self):
+        audio_hash, lyrics = self.audio_hash, self.lyrics
+        self.takes = []
+        self.takes_audio = self.takes_lyrics = self.takes_digest = None
+        if audio_hash is None or not lyrics:
+            return
+
+        def loaded(future):
+            if audio_hash != self.audio_hash or lyrics is not self.lyrics:
+                return
+            try:
+                digest, takes = future.result()
+            except (OSError, ValueError):
+                return
+            self.takes = takes
+            self.takes_audio, self.takes_lyrics, self.takes_digest = audio_hash, lyrics, digest
+            self.refresh.mark('status')
+
+        # Hashing long lyrics and reading the takes file stay off the Tk thread.
+        self.run_in_background(load_recorded_takes, loaded, audio_hash, lyrics)
+
+    def restore_cached_timing(self):
+        self.load_takes()
+        # The cache only holds line times, so it can't seed a word-timing take.
+        if self.audio_hash is None or not self.lyrics or self.recording or self.word_mode_var.get():
+            return
+
+        try:
+            found = lookup_result(self.audio_hash, self.lyrics)
+        except OSError:
+            return
+        if found is None:
+            return
+
+        times, reused = found
+        gaps = missing_ranges(times)
+        if gaps:
+            question = (
+                f"{reused} of {len(self.lyrics)} lines have saved timings from an earlier version of these lyrics.\n"
+                f"The {len(gaps)} changed range(s) would be spaced evenly for you to re-record with punch-in.\n\n"
+                "Load the saved timings?"
+            )
+        else:
+            question = "Saved timings were found for this audio file and lyrics.\n\nLoad them?"
+        if not messagebox.askyesno("Saved Timings Found", question):
+            return
+
+        duration = self.waveform.duration if self.waveform is not None else None
+        # Nothing is saved here, so the new generation makes the next save a full rewrite.
+        self.replace_session(TimingSession(self.lyrics))
+        self.session.replay(fill_gaps(times, duration))
+        self.refresh.mark(*REDRAW_ALL)
+
+        if gaps:
+            first, last = gaps[0]
+            self.punch_from_var.set(str(first + 1))
+            self.punch_to_var.set(str(last + 1))
+
+        if self.json_tab_built:
+            self.update_json_tab()
+
+    def current_takes(self):
+        # Takes only line up while the audio file and lyrics stay the same.
+        if self.takes_lyrics is not self.lyrics or self.takes_audio != self.audio_hash:
+            return []
+        return self.takes
+
+    def record_take(self):
+        if self.takes_lyrics is not self.lyrics or self.takes_audio != self.audio_hash:
+            return
+        times = [t_ns / 1e9 for t_ns in self.timestamps.times_ns]
+        self.takes.append(times)
+        self.writer.submit(
+            ('take', self.takes_digest, len(self.takes)), store_take, self.takes_audio, self.takes_digest, times
+        )
+
+    def merge_takes(self):
+        takes = self.current_takes()
+        if self.recording or len(takes) < 2:
+            return
+
+        try:
+            merged = merge_recorded_takes(takes, len(self.lyrics))
+        except ImportError:
+            messagebox.showerror("Error", "Merging takes needs NumPy")
+            return
+
+        times = [None if math.isnan(t) else float(t) for t in merged.times]
+        self.replace_session(TimingSession(self.lyrics))
+        self.session.replay(fill_gaps(times))
+        self.refresh.mark(*REDRAW_ALL)
+
+        weak = [i for i, c in enumerate(merged.confidence) if c < LOW_CONFIDENCE]
+        summary = f"Merged {len(takes)} takes into one timing."
+        if weak:
+            self.punch_from_var.set(str(weak[0] + 1))
+            self.punch_to_var.set(str(weak[0] + 1))
+            summary += (
+                f"\n{len(weak)} line(s) have low confidence (the takes disagree); "
+                f"the first is line {weak[0] + 1}, preset for punch-in."
+            )
+        messagebox.showinfo("Takes Merged", summary)
+
+        self.save_timestamps()
+        self.notebook.select(1)
+        self.update_json_tab()
+
+    def punch_in(self):
+        try:
+            first = int(self.punch_from_var.get()) - 1
+            last = int(self.punch_to_var.get()) - 1
+        except ValueError:
+            messagebox.showerror("Error", "Enter the line numbers to re-record")
+            return
+
+        if self.recording or not 0 <= first <= last < len(self.timestamps):
+            messagebox.showerror("Error", f"Choose lines between 1 and {len(self.timestamps)}")
+            return
+
+        start = max(0.0, self.timestamps.time(first) - PUNCH_IN_PREROLL)
+        self.audio_clock = AudioClock(self.mixer.music.get_pos, self.latency_ms)
+        self.session.clock = self.audio_clock.position
+
+        try:
+            self.mixer.music.play(start=start)
+            self.audio_clock.start(offset=start)
+            self.session.punch_in(first, last)
+            self.notebook.select(0)
+            self.refresh.mark(*REDRAW_ALL)
+            self.refresh.start_ticker('status', CLOCK_TICK_MS)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to play audio: {str(e)}")
+            self.session.stop()
+            self.refresh.mark(*REDRAW_ALL)
+
+    def finish_punch_in(self, first):
+        self.mixer.music.stop()
+        self.refresh.stop_ticker('status')
+
+        self.save_timestamps(first)
+
+        if self.json_tab_built:
+            self.json_display.refresh()
+
+    def offer_resume(self):
+        data = load_journal(self.journal.file_path)
+        if not data or not data["times"] or len(data["times"]) >= len(data["lyrics"]):
+            return
+
+        if not os.path.exists(data["audio"]):
+            return
+
+        if data["lyrics_changed"]:
+            messagebox.showwarning(
+                "Resume Session",
+                f"An unfinished session for {os.path.basename(data['audio'])} was found, but its lyrics file "
+                "has changed since, so the recorded times may no longer match the lines.\n\n"
+                "The session can't be resumed and has been discarded."
+            )
+            self.journal.discard()
+            return
+
+        resume = messagebox.askyesno(
+            "Resume Session",
+            f"An unfinished session for {os.path.basename(data['audio'])} was found "
+            f"({len(data['times'])} of {len(data['lyrics'])} lines timed).\n\nContinue from where it stopped?"
+        )
+        if not resume:
+            self.journal.discard()
+            return
 
-    def next_line(self):
-        if not self.recording or self.current_line >= len(self.lyrics):
+        self.load_audio_file(data["audio"])
+        if not self.audio_loaded:
             return
 
-        t = time.time() - self.start_time
-        self.timestamps.append({
-            "text": self.lyrics[self.current_line],
-            "time_ms": int(t * 1000),
-            "time_seconds": round(t, 2)
-        })
+        self.lyrics = data["lyrics"]
+        self.begin_session(data["times"])
+
+    def on_close(self):
+        self.writer.close()
+        # Saves finished after the last poll still owe their callbacks (e.g. discarding the journal).
+        for on_done, result, error in self.writer.completed():
+            if on_done is not None:
+                on_done(result, error)
+        self.journal.shutdown()
+        self.background.shutdown(wait=False, cancel_futures=True)
+        if self.profiler is not None:
+            self.profiler.stop(self.root)
+            file_path = self.profiler.default_trace_path()
+            try:
+                self.profiler.export_trace(file_path)
+                print(self.profiler.summary_table())
+                print(f"Trace written to {file_path}")
+            except OSError as e:
+                print(f"Failed to write trace: {e}", file=sys.stderr)
+        self.root.destroy()
+
+    def setup_hotkeys(self):
+        for sequence in ('<space>', '<Return>'):
+            self.root.bind(sequence, self._on_tap_key)
+        for sequence in ('<BackSpace>', '<Control-z>'):
+            self.root.bind(sequence, self._on_undo_key)
+        for sequence in ('<KeyPress>', '<ButtonPress>', '<Motion>'):
+            self.root.bind_all(sequence, self._observe_event, add='+')
+
+    def _is_typing(self, event):
+        widget = event.widget
+        return (
+            isinstance(widget, tk.Misc)
+            and widget.winfo_class() in TEXT_INPUT_CLASSES
+            # ttk widgets report an empty state when nothing is set.
+            and str(widget.cget('state')) in ('normal', '')
+        )
 
-        self.current_line += 1
+    def event_time_ns(self, event, handler_ns):
+        """perf_counter_ns of the key / button press behind event, falling back to handler_ns."""
+        if event is not None and isinstance(event.time, int) and event.time:
+            return self.event_clock.to_monotonic(event.time, handler_ns)
+        return handler_ns
+
+    def _observe_event(self, event):
+        if isinstance(event.time, int) and event.time:
+            self.event_clock.observe(event.time)
+
+    def _on_tap_key(self, event):
+        if self._is_typing(event):
+            return None
+        self.next_line(event)
+        return 'break'
+
+    def _on_undo_key(self, event):
+        if self._is_typing(event):
+            return None
+        self.undo_line()
+        return 'break'
+
+    def _on_next_button(self, event):
+        if str(self.next_btn.cget('state')) != 'disabled':
+            self.next_line(event)
+
+    def next_line(self, event=None):
+        handler_ns = time.perf_counter_ns()
+        if not self.recording:
+            return
 
-        if self.current_line >= len(self.lyrics):
-            self.recording = False
-            mixer.music.stop()
-            self.save_timestamps()
+        event_ns = self.event_time_ns(event, handler_ns)
+        t = self.audio_clock.position(event_ns)
+        if self.snap_var.get() and self.onset_times is not None:
+            t = snap_to_onset(t, self.onset_times)
+
+        punch_first = self.session.punch_first
+        if self.session.tap(now=t) is None:
+            return
+        self.tap_latency.record(event_ns, handler_ns, time.perf_counter_ns())
+
+        self.refresh.mark(*REDRAW_ALL)
+
+        if punch_first is not None:
+            if not self.session.punching:
+                self.finish_punch_in(punch_first)
+
+        elif self.session.finished:
+            self.mixer.music.stop()
+            self.refresh.stop_ticker('status')
+            self.journal.close()
+            self.record_take()
+            self.save_timestamps(on_saved=self.discard_journal)
 
             # Auto-switch to JSON
             self.notebook.select(1)
             self.update_json_tab()
 
-        else:
-            self.display_current_line()
+    def undo_line(self):
+        if not self.recording:
+            return
 
-        self.update_status()
+        punching = self.session.punching
+        line = self.session.undo()
+        if line is not None:
+            if not punching and self.session.current_word == 0:
+                self.journal.undo(line)
+            self.refresh.mark(*REDRAW_ALL)
+
+    def show_tap_latency(self):
+        window = tk.Toplevel(self.root)
+        window.title("📊 Tap Latency")
+        window.configure(bg=self.card_bg)
+        window.transient(self.root)
+
+        for histogram in self.tap_latency.histograms():
+            summary = histogram.summary()
+            tk.Label(
+                window,
+                text=(
+                    f"{histogram.name.replace('_', ' ')}: {summary['count']} taps | "
+                    f"p50 {summary['p50_ms']:.2f} ms | p90 {summary['p90_ms']:.2f} ms | "
+                    f"p99 {summary['p99_ms']:.2f} ms | max {summary['max_ms']:.2f} ms"
+                ),
+                font=('Arial', 11, 'bold'),
+                fg=self.text_color,
+                bg=self.card_bg
+            ).pack(anchor='w', padx=20, pady=(15, 5))
+
+            peak = max(histogram.counts) or 1
+            rows = "\n".join(
+                f"{label:>16} | {'█' * round(30 * count / peak)} {count}"
+                for label, count in zip(histogram.bucket_labels(), histogram.counts)
+            )
+            tk.Label(
+                window,
+                text=rows,
+                font=('Consolas', 10),
+                fg=self.text_secondary,
+                bg=self.card_bg,
+                justify='left'
+            ).pack(anchor='w', padx=20)
+
+        def export():
+            file_path = filedialog.asksaveasfilename(
+                parent=window,
+                title="Export Tap Latency",
+                defaultextension=".json",
+                filetypes=[("JSON", "*.json"), ("CSV", "*.csv")]
+            )
+            if file_path:
+                try:
+                    self.tap_latency.export(file_path)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to export latency data: {str(e)}", parent=window)
 
-    def save_timestamps(self):
-        self.json_output = json.dumps(self.timestamps, ensure_ascii=False, indent=2)
+        tk.Button(
+            window,
+            text="💾 Export",
+            font=('Arial', 10, 'bold'),
+            bg=self.success,
+            fg=self.text_color,
+            relief='raised',
+            bd=3,
+            width=12,
+            command=export
+        ).pack(pady=15)
 
-        try:
-            with open("timestamps.json", "w", encoding="utf-8") as f:
-                f.write(self.json_output)
+        if self.profiler is not None:
+            self.show_profile(window)
+
+    def show_profile(self, window):
+        tk.Label(
+            window,
+            text="Handler profile",
+            font=('Arial', 11, 'bold'),
+            fg=self.text_color,
+            bg=self.card_bg
+        ).pack(anchor='w', padx=20, pady=(5, 5))
 
-            messagebox.showinfo(
-                "Success",
-                f"Saved {len(self.timestamps)} timestamps!\nSwitching to JSON Output."
+        tk.Label(
+            window,
+            text=self.profiler.summary_table(),
+            font=('Consolas', 10),
+            fg=self.text_secondary,
+            bg=self.card_bg,
+            justify='left'
+        ).pack(anchor='w', padx=20)
+
+        def export():
+            file_path = filedialog.asksaveasfilename(
+                parent=window,
+                title="Export Trace",
+                defaultextension=".json",
+                initialfile=os.path.basename(self.profiler.default_trace_path()),
+                filetypes=[("Chrome trace / Perfetto", "*.json")]
             )
+            if file_path:
+                try:
+                    self.profiler.export_trace(file_path)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to export trace: {str(e)}", parent=window)
 
+        tk.Button(
+            window,
+            text="💾 Export Trace",
+            font=('Arial', 10, 'bold'),
+            bg=self.success,
+            fg=self.text_color,
+            relief='raised',
+            bd=3,
+            width=14,
+            command=export
+        ).pack(pady=15)
+
+    def calibrate_latency(self):
+        if self.recording:
+            return
+
+        click_path, clicks = make_click_track()
+        try:
+            self.ensure_mixer()
+            self.mixer.music.load(click_path)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save JSON: {str(e)}")
+            os.remove(click_path)
+            messagebox.showerror("Error", f"Failed to play click track: {str(e)}")
+            return
+
+        clock = AudioClock(self.mixer.music.get_pos)
+        taps = []
+
+        # Same path as recording taps: timed from the press event, not the handler.
+        def tap(event):
+            taps.append(clock.position(self.event_time_ns(event, time.perf_counter_ns())))
+
+        window = tk.Toplevel(self.root)
+        window.title("🎯 Latency Calibration")
+        window.configure(bg=self.card_bg)
+        window.transient(self.root)
+
+        tk.Label(
+            window,
+            text=f"Tap SPACE or the button on each of the {len(clicks)} clicks",
+            font=('Arial', 12, 'bold'),
+            fg=self.text_color,
+            bg=self.card_bg
+        ).pack(padx=20, pady=(20, 10))
+
+        tap_btn = tk.Button(
+            window,
+            text="👆 TAP",
+            font=('Arial', 12, 'bold'),
+            bg=self.success,
+            fg=self.text_color,
+            relief='raised',
+            bd=4,
+            width=18,
+            height=2
+        )
+        tap_btn.pack(padx=20, pady=(0, 20))
+        tap_btn.bind('<ButtonPress-1>', tap)
+        window.bind('<space>', tap)
+        window.focus_set()
+
+        def finish():
+            self.mixer.music.stop()
+            window.destroy()
+            os.remove(click_path)
+            if self.audio_loaded:
+                self.mixer.music.load(self.selected_audio_file)
+
+            latency = estimate_latency(taps, clicks)
+            if latency is None:
+                messagebox.showwarning("Warning", "Not enough taps lined up with the clicks. Please try again.")
+                return
+
+            self.latency_ms = latency
+            save_latency(self.device_key, latency)
+            self.latency_label.config(text=f"Output latency: {latency:.1f} ms", fg=self.success)
+
+        self.mixer.music.play()
+        clock.start()
+        window.after(int((clicks[-1] + 1.0) * 1000), finish)
+
+    def choose_output_path(self):
+        stem = self.output_var.get().strip() or os.path.abspath(OUTPUT_STEM)
+        file_path = filedialog.asksaveasfilename(
+            title="Save Timestamps As",
+            initialdir=os.path.dirname(stem),
+            initialfile=os.path.basename(stem) + EXPORTERS["json"].extension,
+            filetypes=[("All Files", "*.*")]
+        )
+        if file_path:
+            self.output_var.set(strip_extension(file_path))
+
+    def save_timestamps(self, first=0, on_saved=None):
+        formats = [name for name, var in self.export_vars.items() if var.get()] or ["json"]
+        stem = strip_extension(self.output_var.get().strip()) or OUTPUT_STEM
+        targets = {name: stem + EXPORTERS[name].extension for name in formats}
+        snapshot = self.timestamps.copy()
+
+        self.writer.submit(
+            'export', self.write_exports, snapshot, targets, first, self.session_generation,
+            on_done=lambda result, error: self.exports_saved(result, error, on_saved),
+            merge=merge_exports
+        )
+        if self.audio_hash is not None and len(snapshot) == len(self.lyrics):
+            self.writer.submit('cache', cache_result, self.audio_hash, self.lyrics, snapshot)
+        if len(snapshot) == len(self.lyrics):
+            # Display name only; the catalog tells tracks apart by audio hash or path.
+            name = os.path.splitext(os.path.basename(self.selected_audio_file))[0] or os.path.basename(stem)
+            self.writer.submit('catalog', catalog_result, name, snapshot, self.selected_audio_file, self.audio_hash)
+
+        self.refresh.configure(self.save_status_label, text="💾 Saving...", fg=self.text_secondary)
+        self.watch_writer()
+
+    def write_exports(self, timestamps, targets, first, generation):
+        # Runs on the writer thread, which is the only one touching the offsets.
+        same_files = targets == self.export_targets and generation == self.export_generation
+        previous = self.export_offsets if same_files else None
+        self.export_offsets = export_many(timestamps, targets, previous, first if previous else 0)
+        self.export_targets = targets
+        self.export_generation = generation
+        return len(timestamps), list(targets.values())
+
+    def exports_saved(self, result, error, on_saved=None):
+        if error is not None:
+            self.refresh.configure(self.save_status_label, text=f"✗ Failed to save: {error}", fg=self.error)
+            return
+
+        count, paths = result
+        self.refresh.configure(
+            self.save_status_label,
+            text=f"✓ Saved {count} timestamps to {', '.join(paths)} at {time.strftime('%H:%M:%S')}",
+            fg=self.success
+        )
+        if on_saved is not None:
+            on_saved()
+
+    def watch_writer(self):
+        if self.watching_writer:
+            return
+        self.watching_writer = True
+
+        def poll():
+            idle = self.writer.idle
+            for on_done, result, error in self.writer.completed():
+                if on_done is not None:
+                    on_done(result, error)
+            if idle:
+                self.watching_writer = False
+            else:
+                self.root.after(50, poll)
+
+        self.root.after(50, poll)
+
+    def discard_journal(self):
+        if not self.recording:
+            self.journal.discard()
 
     def update_json_tab(self):
-        self.json_display.config(state=tk.NORMAL)
-        self.json_display.delete(1.0, tk.END)
-        self.json_display.insert(1.0, self.json_output)
-        self.json_display.config(state=tk.DISABLED)
+        self.ensure_json_tab()
+        self.json_display.set_entries(self.timestamps)
         self.json_info_label.config(
             text=f"Loaded {len(self.timestamps)} timestamps.",
             fg=self.success
         )
-        self.json_display.see(1.0)
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from lyric_batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "catalog":
+        from catalog import main as catalog_main
+        sys.exit(catalog_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from timing_server import main as serve_main
+        sys.exit(serve_main(sys.argv[2:]))
+
+    profiler = None
+    if "--profile" in sys.argv[1:] or os.environ.get("LYRICS_PROFILE"):
+        profiler = Profiler()
+
     root = tk.Tk()
-    app = LyricsTimestampGenerator(root)
+    app = LyricsTimestampGenerator(root, profiler)
     root.mainloop()
 
 
@@ -0,0 +1,126 @@
+from array import array
+from collections.abc import Sequence
+from itertools import islice
+
+
+def tokenize(text):
+    return text.split() or [text]
+
+
+def make_entry(text, t):
+    return {
+        "text": text,
+        "time_ms": int(t * 1000),
+        "time_seconds": round(t, 2)
+    }
+
+
+class TimestampStore(Sequence):
+    """Columnar timestamps: one lyric line index and one int64 ns time per tap.
+
+    Text and the ms/seconds fields are derived from the lyrics source when
+    an entry is read, so indexing still yields the familiar entry dicts.
+    """
+
+    __slots__ = ('lyrics', 'lines', 'times_ns', 'words')
+
+    def __init__(self, lyrics, words=None):
+        self.lyrics = lyrics
+        self.lines = array('q')
+        self.times_ns = array('q')
+        self.words = words
+
+    def __len__(self):
+        return len(self.times_ns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return make_entry(self.lyrics[self.lines[index]], self.times_ns[index] / 1e9)
+
+    def append(self, line, t):
+        self.lines.append(line)
+        self.times_ns.append(round(t * 1e9))
+
+    def extend(self, times, first_line=0):
+        self.lines.extend(range(first_line, first_line + len(times)))
+        self.times_ns.extend(round(t * 1e9) for t in times)
+
+    def truncate(self, length):
+        del self.lines[length:]
+        del self.times_ns[length:]
+
+    def time(self, index):
+        return self.times_ns[index] / 1e9
+
+    def text(self, index):
+        return self.lyrics[self.lines[index]]
+
+    def items(self, first=0):
+        lyrics = self.lyrics
+        for line, t_ns in zip(islice(self.lines, first, None), islice(self.times_ns, first, None)):
+            yield lyrics[line], t_ns / 1e9
+
+    def set(self, index, t):
+        self.times_ns[index] = round(t * 1e9)
+
+    def copy(self):
+        store = TimestampStore(self.lyrics, None if self.words is None else self.words.copy())
+        store.lines = self.lines[:]
+        store.times_ns = self.times_ns[:]
+        return store
+
+    def to_list(self):
+        return [make_entry(text, t_ns / 1e9) for text, t_ns in zip(map(self.lyrics.__getitem__, self.lines), self.times_ns)]
+
+
+class WordTimes:
+    """Per-word tap times as two flat columns.
+
+    times_ns holds every word in tap order; offsets[i] is where line i's
+    words start in it, so a line's words are the range up to the next
+    line's offset. Word text is re-derived from the lyrics with tokenize().
+    """
+
+    __slots__ = ('lyrics', 'offsets', 'times_ns')
+
+    def __init__(self, lyrics):
+        self.lyrics = lyrics
+        self.offsets = array('q')
+        self.times_ns = array('q')
+
+    def __len__(self):
+        return len(self.times_ns)
+
+    def append(self, line, t):
+        if line == len(self.offsets):
+            self.offsets.append(len(self.times_ns))
+        self.times_ns.append(round(t * 1e9))
+
+    def pop(self):
+        self.times_ns.pop()
+        if self.offsets and self.offsets[-1] == len(self.times_ns):
+            self.offsets.pop()
+
+    def truncate(self, line_count):
+        if line_count < len(self.offsets):
+            del self.times_ns[self.offsets[line_count]:]
+            del self.offsets[line_count:]
+
+    def word_range(self, line):
+        start = self.offsets[line]
+        end = self.offsets[line + 1] if line + 1 < len(self.offsets) else len(self.times_ns)
+        return start, end
+
+    def set(self, index, t):
+        self.times_ns[index] = round(t * 1e9)
+
+    def line_words(self, line):
+        start, end = self.word_range(line)
+        return list(zip(tokenize(self.lyrics[line]), (t_ns / 1e9 for t_ns in self.times_ns[start:end])))
+
+    def copy(self):
+        words = WordTimes(self.lyrics)
+        words.offsets = self.offsets[:]
+        words.times_ns = self.times_ns[:]
+        return words
@@ -0,0 +1,102 @@
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+MAGIC = b"LTIX"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")
+
+
+def write_index(timestamps, file_path):
+    """Write a .lti file: header, sorted int64 ns times, int64 text offsets, UTF-8 text.
+
+    Every section is 8-byte aligned, so readers can mmap the file and use the
+    time column directly.
+    """
+    order = sorted(range(len(timestamps)), key=timestamps.times_ns.__getitem__)
+    times = array('q', (timestamps.times_ns[i] for i in order))
+
+    offsets = array('q', [0])
+    chunks = []
+    size = 0
+    for i in order:
+        data = timestamps.text(i).encode("utf-8")
+        chunks.append(data)
+        size += len(data)
+        offsets.append(size)
+
+    if sys.byteorder != "little":
+        times.byteswap()
+        offsets.byteswap()
+
+    with open(file_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(times), size))
+        f.write(times.tobytes())
+        f.write(offsets.tobytes())
+        f.write(b"".join(chunks))
+
+
+class TimingIndex:
+    """Memory-mapped reader for .lti files with bisect-based lookups."""
+
+    def __init__(self, file_path):
+        with open(file_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count, text_size = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"Not a timing index file: {file_path}")
+
+        times_start = HEADER.size
+        offsets_start = times_start + count * 8
+        self._text_start = offsets_start + (count + 1) * 8
+        if len(self._map) < self._text_start + text_size:
+            self._map.close()
+            raise ValueError(f"Truncated timing index file: {file_path}")
+
+        self._view = None
+        if sys.byteorder == "little":
+            self._view = memoryview(self._map)
+            self.times_ns = self._view[times_start:offsets_start].cast('q')
+            self.offsets = self._view[offsets_start:self._text_start].cast('q')
+        else:
+            self.times_ns = array('q', self._map[times_start:offsets_start])
+            self.offsets = array('q', self._map[offsets_start:self._text_start])
+            self.times_ns.byteswap()
+            self.offsets.byteswap()
+
+    def __len__(self):
+        return len(self.times_ns)
+
+    def time(self, index):
+        return self.times_ns[index] / 1e9
+
+    def text(self, index):
+        start = self._text_start + self.offsets[index]
+        end = self._text_start + self.offsets[index + 1]
+        return self._map[start:end].decode("utf-8")
+
+    def line_at(self, t):
+        """Index of the line active at t seconds, or -1 before the first line."""
+        return bisect_right(self.times_ns, int(t * 1e9)) - 1
+
+    def lines_between(self, t0, t1):
+        """Range of line indices active at any point in [t0, t1)."""
+        first = max(self.line_at(t0), 0)
+        return range(first, bisect_left(self.times_ns, int(t1 * 1e9), lo=first))
+
+    def close(self):
+        if self._view is not None:
+            self.times_ns.release()
+            self.offsets.release()
+            self._view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
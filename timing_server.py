@@ -0,0 +1,459 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import os
+import struct
+import math
+import sys
+import tempfile
+import time
+from collections import deque
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from exporters import EXPORTERS, export_many
+from lyric_core import TimingSession, WordTimingSession, parse_lyrics
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_TEXT, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x8, 0x9, 0xA
+MAX_BODY = 16 * 1024 * 1024
+RTT_WINDOW = 16
+PING_INTERVAL = 1.0
+WARMUP_PINGS = 5
+CONTENT_TYPES = {".json": "application/json", ".vtt": "text/vtt", ".lti": "application/octet-stream"}
+
+
+def server_time():
+    return time.perf_counter_ns() / 1e9
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- WebSocket framing (RFC 6455), shared with the load-test client ----------
+
+def websocket_accept(key):
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+
+
+def _xor(data, mask):
+    n = len(data)
+    key = (mask * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(key, "big")).to_bytes(n, "big")
+
+
+def encode_frame(opcode, payload, mask=False):
+    n = len(payload)
+    bit = 0x80 if mask else 0
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, bit | n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, bit | 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, bit | 127, n)
+    if not mask:
+        return header + payload
+    key = os.urandom(4)
+    return header + key + _xor(payload, key)
+
+
+async def read_frame(reader):
+    """(opcode, payload) of the next message; fragmented messages are joined."""
+    opcode = None
+    chunks = []
+    while True:
+        b0, b1 = await reader.readexactly(2)
+        size = b1 & 0x7F
+        if size == 126:
+            size = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif size == 127:
+            size = struct.unpack("!Q", await reader.readexactly(8))[0]
+        if size > MAX_BODY:
+            raise ConnectionError("WebSocket frame too large")
+
+        key = await reader.readexactly(4) if b1 & 0x80 else None
+        payload = await reader.readexactly(size)
+        if key and payload:
+            payload = _xor(payload, key)
+
+        frame_opcode = b0 & 0x0F
+        if frame_opcode >= OP_CLOSE:
+            return frame_opcode, payload
+        if frame_opcode:
+            opcode = frame_opcode
+        chunks.append(payload)
+        if b0 & 0x80:
+            return opcode, b"".join(chunks)
+
+
+# --- HTTP/1.1 ------------------------------------------------------------------
+
+async def read_request(reader):
+    """(method, path, headers, body), or None when the client closed the connection."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise
+
+    lines = head.decode("latin-1").split("\r\n")
+    request_line = lines[0].split(" ", 2)
+    if len(request_line) != 3:
+        raise HttpError(400, "malformed request line")
+    method, target, _ = request_line
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HttpError(400, "invalid Content-Length") from None
+    if length < 0:
+        raise HttpError(400, "invalid Content-Length")
+    if length > MAX_BODY:
+        raise HttpError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, urlsplit(target).path, headers, body
+
+
+def write_response(writer, status, body=b"", content_type="application/json"):
+    writer.write(
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n".encode("latin-1") + body
+    )
+
+
+def json_body(body):
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HttpError(400, "request body is not valid JSON") from None
+    if not isinstance(data, dict):
+        raise HttpError(400, "request body must be a JSON object")
+    return data
+
+
+def number_field(data, name, default):
+    value = data.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise HttpError(400, f"{name} must be a number")
+    return float(value)
+
+
+def render_export(timestamps, name):
+    """(bytes, content type) of one export; runs off the event loop."""
+    extension = EXPORTERS[name].extension
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "export" + extension)
+        export_many(timestamps, {name: file_path})
+        with open(file_path, "rb") as f:
+            return f.read(), CONTENT_TYPES.get(os.path.splitext(extension)[1], "text/plain; charset=utf-8")
+
+
+# --- Sessions --------------------------------------------------------------------
+
+class ClientLink:
+    """One WebSocket client and its one-way latency estimate.
+
+    The server pings every client with JSON messages handled on the same path
+    as taps; half of the smallest recent round trip is taken as the delay
+    between the operator's tap and the server receiving it.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.rtts = deque(maxlen=RTT_WINDOW)
+        self.pings = {}
+        self.counter = itertools.count()
+
+    @property
+    def one_way(self):
+        return min(self.rtts) / 2 if self.rtts else 0.0
+
+    def send(self, message):
+        self.writer.write(encode_frame(OP_TEXT, json.dumps(message).encode("utf-8")))
+
+    def ping(self):
+        if len(self.pings) >= RTT_WINDOW:
+            self.pings.pop(next(iter(self.pings)))
+        n = next(self.counter)
+        self.pings[n] = server_time()
+        self.send({"type": "ping", "n": n})
+
+    def pong(self, n, now):
+        sent = self.pings.pop(n, None)
+        if sent is not None:
+            self.rtts.append(now - sent)
+
+
+class ServerSession:
+    def __init__(self, session_id, lyrics, words=False):
+        self.id = session_id
+        self.lyrics = lyrics
+        self.words = words
+        self.session = (WordTimingSession if words else TimingSession)(lyrics, clock=server_time)
+        self.links = set()
+
+    def state(self):
+        session = self.session
+        return {
+            "id": self.id,
+            "lines": len(self.lyrics),
+            "timed": len(session.timestamps),
+            "current_line": session.current_line,
+            "current_word": session.current_word,
+            "recording": session.recording,
+            "finished": session.finished,
+            "words": self.words,
+        }
+
+    def broadcast(self, message, skip=None):
+        for link in self.links:
+            if link is not skip:
+                link.send(message)
+
+
+class TimingServer:
+    def __init__(self):
+        self.sessions = {}
+        self.ids = itertools.count(1)
+
+    def lookup(self, session_id):
+        try:
+            return self.sessions[session_id]
+        except KeyError:
+            raise HttpError(404, f"no session {session_id}") from None
+
+    def create(self, data):
+        if "lyrics" in data and not isinstance(data["lyrics"], list):
+            raise HttpError(400, "lyrics must be a list of lines")
+        if isinstance(data.get("lyrics"), list):
+            # Same cleanup as parse_lyrics: stripped lines, blanks dropped.
+            lyrics = [str(line).strip() for line in data["lyrics"] if str(line).strip()]
+        else:
+            lyrics = parse_lyrics(str(data.get("text", "")))
+        if not lyrics:
+            raise HttpError(400, "a session needs lyrics")
+
+        session = ServerSession(str(next(self.ids)), lyrics, bool(data.get("words")))
+        self.sessions[session.id] = session
+        return session
+
+    # Actions shared by HTTP and WebSocket clients. `now` is the server time
+    # of the operator's action, already corrected for their latency.
+
+    def start(self, session, now):
+        if session.session.recording:
+            raise HttpError(409, "session is already recording")
+        session.session.start(now)
+        return dict(session.state(), type="started")
+
+    def tap(self, session, now):
+        line, word = session.session.current_line, session.session.current_word
+        t = session.session.tap(now)
+        if t is None:
+            raise HttpError(409, "session is not recording")
+        return {"type": "tapped", "line": line, "word": word, "t": t}
+
+    def undo(self, session):
+        line = session.session.undo()
+        if line is None:
+            raise HttpError(409, "nothing to undo")
+        return {"type": "undone", "line": line, "word": session.session.current_word}
+
+    async def export(self, session, name):
+        if name not in EXPORTERS:
+            raise HttpError(404, f"unknown export format {name}")
+        # Export a snapshot on a worker thread so file I/O doesn't hold up other operators.
+        snapshot = session.session.timestamps.copy()
+        return await asyncio.get_running_loop().run_in_executor(None, render_export, snapshot, name)
+
+    async def dispatch(self, method, path, body, received):
+        parts = [p for p in path.split("/") if p]
+        if not parts or parts[0] != "sessions":
+            raise HttpError(404, f"no route for {path}")
+
+        if len(parts) == 1:
+            if method == "GET":
+                return 200, [s.state() for s in self.sessions.values()]
+            if method == "POST":
+                return 201, self.create(json_body(body)).state()
+            raise HttpError(405, f"{method} not allowed on {path}")
+
+        session = self.lookup(parts[1])
+        if len(parts) == 2:
+            if method == "GET":
+                return 200, session.state()
+            if method == "DELETE":
+                del self.sessions[session.id]
+                return 200, {"deleted": session.id}
+            raise HttpError(405, f"{method} not allowed on {path}")
+
+        action = parts[2]
+        if action == "export" and len(parts) == 4 and method == "GET":
+            return 200, await self.export(session, parts[3])
+        if method != "POST" or len(parts) != 3:
+            raise HttpError(405, f"{method} not allowed on {path}")
+
+        # HTTP clients can't be pinged, so they report their own latency.
+        now = received - number_field(json_body(body), "latency_ms", 0.0) / 1000
+        if action == "start":
+            event = self.start(session, now)
+        elif action == "tap":
+            event = self.tap(session, now)
+        elif action == "undo":
+            event = self.undo(session)
+        else:
+            raise HttpError(404, f"no route for {path}")
+        session.broadcast(event)
+        return 200, event
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as e:
+                    write_response(writer, e.status, json.dumps({"error": str(e)}).encode("utf-8"))
+                    break
+                if request is None:
+                    break
+
+                received = server_time()
+                method, path, headers, body = request
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self.websocket(reader, writer, path, headers)
+                    break
+
+                try:
+                    status, payload = await self.dispatch(method, path, body, received)
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except (ValueError, TypeError) as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    # e.g. an OSError while rendering an export: answer instead of dropping the connection.
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                if isinstance(payload, tuple):
+                    write_response(writer, status, *payload)
+                else:
+                    write_response(writer, status, json.dumps(payload).encode("utf-8"))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def websocket(self, reader, writer, path, headers):
+        parts = [p for p in path.split("/") if p]
+        key = headers.get("sec-websocket-key")
+        if len(parts) != 3 or parts[0] != "sessions" or parts[2] != "ws" or parts[1] not in self.sessions or not key:
+            write_response(writer, 404, b'{"error": "no WebSocket endpoint here"}')
+            return
+
+        session = self.sessions[parts[1]]
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {websocket_accept(key)}\r\n\r\n".encode("latin-1")
+        )
+        link = ClientLink(writer)
+        session.links.add(link)
+        link.send(dict(session.state(), type="state"))
+        pinger = asyncio.create_task(self.keep_pinging(link))
+
+        try:
+            while True:
+                opcode, payload = await read_frame(reader)
+                now = server_time()
+                if opcode == OP_CLOSE:
+                    writer.write(encode_frame(OP_CLOSE, payload[:2]))
+                    break
+                if opcode == OP_PING:
+                    writer.write(encode_frame(OP_PONG, payload))
+                    continue
+                if opcode != OP_TEXT:
+                    continue
+
+                message = None
+                try:
+                    message = json.loads(payload)
+                    kind = message.get("type")
+                    if kind == "pong":
+                        link.pong(message.get("n"), now)
+                        continue
+                    if kind == "tap":
+                        event = self.tap(session, now - link.one_way)
+                    elif kind == "undo":
+                        event = self.undo(session)
+                    elif kind == "start":
+                        event = self.start(session, now - link.one_way)
+                    elif kind == "state":
+                        event = dict(session.state(), type="state")
+                    else:
+                        raise HttpError(400, f"unknown message type {kind!r}")
+                except (HttpError, ValueError, TypeError, AttributeError) as e:
+                    seq = message.get("seq") if isinstance(message, dict) else None
+                    link.send({"type": "error", "error": str(e), "seq": seq})
+                else:
+                    link.send(dict(event, seq=message.get("seq")))
+                    if kind != "state":
+                        session.broadcast(event, skip=link)
+                await writer.drain()
+        finally:
+            pinger.cancel()
+            session.links.discard(link)
+
+    async def keep_pinging(self, link):
+        # A burst of pings first, so the latency estimate is usable right away.
+        for _ in range(WARMUP_PINGS):
+            link.ping()
+            await asyncio.sleep(0.05)
+        while True:
+            link.ping()
+            await asyncio.sleep(PING_INTERVAL)
+
+
+async def serve(host, port, ready=print):
+    server = TimingServer()
+    listener = await asyncio.start_server(server.handle, host, port, backlog=1024)
+    bound = listener.sockets[0].getsockname()
+    ready(f"Listening on http://{bound[0]}:{bound[1]}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="time_lyric serve",
+        description="Local HTTP/WebSocket timing service for several operators at once."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on (0.0.0.0 for the LAN)")
+    parser.add_argument("-p", "--port", type=int, default=8765, help="0 picks a free port")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, ready=lambda text: print(text, flush=True)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+FRAME_MS = 16
+
+
+class RefreshScheduler:
+    """Coalesces redraw requests into at most one pass per frame.
+
+    Parts of the UI register a redraw callback under a name; callers mark
+    names dirty and the scheduler runs each dirty callback once on the next
+    root.after tick, in registration order.
+    """
+
+    def __init__(self, root, frame_ms=FRAME_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.redraws = {}
+        self.dirty = set()
+        self.pending = None
+        self.tickers = {}
+        self.applied = {}
+
+    def register(self, name, callback):
+        self.redraws[name] = callback
+
+    def mark(self, *names):
+        self.dirty.update(names)
+        if self.pending is None:
+            self.pending = self.root.after(self.frame_ms, self.flush)
+
+    def flush(self):
+        self.pending = None
+        dirty, self.dirty = self.dirty, set()
+        for name, callback in self.redraws.items():
+            if name in dirty:
+                callback()
+
+    def start_ticker(self, name, every_ms):
+        if name in self.tickers:
+            return
+
+        def tick():
+            self.mark(name)
+            self.tickers[name] = self.root.after(every_ms, tick)
+
+        self.tickers[name] = self.root.after(every_ms, tick)
+
+    def stop_ticker(self, name):
+        after_id = self.tickers.pop(name, None)
+        if after_id is not None:
+            self.root.after_cancel(after_id)
+
+    def configure(self, widget, **options):
+        """widget.config(**options), skipping options already applied with the same value."""
+        applied = self.applied.setdefault(str(widget), {})
+        changed = {k: v for k, v in options.items() if applied.get(k) != v}
+        if changed:
+            widget.config(**changed)
+            applied.update(changed)
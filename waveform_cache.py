@@ -0,0 +1,176 @@
+import json
+import os
+import wave
+
+import numpy as np
+
+from lyric_core import file_hash
+from settings import SETTINGS_DIR
+
+CACHE_DIR = os.path.join(SETTINGS_DIR, "peaks")
+BASE_BLOCK = 256
+FORMAT_VERSION = 1
+
+
+def decode_wav(file_path):
+    with wave.open(file_path, 'rb') as w:
+        channels = w.getnchannels()
+        width = w.getsampwidth()
+        rate = w.getframerate()
+        data = w.readframes(w.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8) | (raw[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        samples = ints.astype(np.float32) / 0x800000
+    else:
+        dtype = np.int16 if width == 2 else np.int32
+        samples = np.frombuffer(data, dtype=dtype).astype(np.float32) / np.iinfo(dtype).max
+
+    return samples.reshape(-1, channels).mean(axis=1), rate
+
+
+def decode_with_mixer(file_path):
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    from pygame import mixer, sndarray
+    if not mixer.get_init():
+        mixer.init()
+
+    rate, size, _ = mixer.get_init()
+    data = sndarray.array(mixer.Sound(file_path)).astype(np.float32)
+    data /= float(2 ** (abs(size) - 1))
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    return data, rate
+
+
+def decode_audio(file_path):
+    if file_path.lower().endswith('.wav'):
+        try:
+            return decode_wav(file_path)
+        except wave.Error:
+            pass
+    return decode_with_mixer(file_path)
+
+
+def build_pyramid(samples, base_block=BASE_BLOCK):
+    """Stack of (min, max, rms) rows; level k summarizes base_block * 2**k samples per row."""
+    count = -(-len(samples) // base_block)
+    padded = np.zeros(count * base_block, dtype=np.float32)
+    padded[:len(samples)] = samples
+    blocks = padded.reshape(count, base_block)
+
+    level = np.empty((count, 3), dtype=np.float32)
+    level[:, 0] = blocks.min(axis=1)
+    level[:, 1] = blocks.max(axis=1)
+    level[:, 2] = np.sqrt(np.square(blocks).mean(axis=1))
+
+    levels = [level]
+    while len(level) > 1:
+        if len(level) % 2:
+            level = np.vstack([level, level[-1:]])
+        pairs = level.reshape(-1, 2, 3)
+        level = np.empty((len(pairs), 3), dtype=np.float32)
+        level[:, 0] = pairs[:, :, 0].min(axis=1)
+        level[:, 1] = pairs[:, :, 1].max(axis=1)
+        level[:, 2] = np.sqrt(np.square(pairs[:, :, 2]).mean(axis=1))
+        levels.append(level)
+
+    return levels
+
+
+class PeakPyramid:
+    def __init__(self, data, meta):
+        self.data = data
+        self.sample_rate = meta["sample_rate"]
+        self.sample_count = meta["sample_count"]
+        self.base_block = meta["base_block"]
+        bounds = meta["level_offsets"]
+        self.levels = [data[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+    @property
+    def duration(self):
+        return self.sample_count / self.sample_rate
+
+    def peaks(self, start, end, width):
+        """(min, max, rms) arrays with one value per pixel column for [start, end) seconds."""
+        width = max(1, int(width))
+        samples_per_pixel = max(1.0, (end - start) * self.sample_rate / width)
+
+        level_index = 0
+        while (level_index + 1 < len(self.levels)
+               and self.base_block * 2 ** (level_index + 1) <= samples_per_pixel):
+            level_index += 1
+        level = self.levels[level_index]
+        block = self.base_block * 2 ** level_index
+
+        first = int(start * self.sample_rate / block)
+        last = max(first + 1, int(np.ceil(end * self.sample_rate / block)))
+        rows = level[max(0, first):min(len(level), last)]
+        if not len(rows):
+            empty = np.zeros(width, dtype=np.float32)
+            return empty, empty, empty
+
+        edges = np.linspace(0, len(rows), width + 1).astype(np.int64)[:-1]
+        edges = np.minimum(edges, len(rows) - 1)
+        return (
+            np.minimum.reduceat(rows[:, 0], edges),
+            np.maximum.reduceat(rows[:, 1], edges),
+            np.sqrt(np.add.reduceat(np.square(rows[:, 2]), edges) / np.maximum(np.diff(np.append(edges, len(rows))), 1)),
+        )
+
+
+def cache_paths(digest, cache_dir=CACHE_DIR):
+    base = os.path.join(cache_dir, digest)
+    return base + ".npy", base + ".json"
+
+
+def load_cached(digest, cache_dir=CACHE_DIR):
+    data_path, meta_path = cache_paths(digest, cache_dir)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            return None
+        return PeakPyramid(np.load(data_path, mmap_mode='r'), meta)
+    except (OSError, ValueError):
+        return None
+
+
+def save_pyramid(digest, levels, sample_rate, sample_count, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = cache_paths(digest, cache_dir)
+
+    offsets = [0]
+    for level in levels:
+        offsets.append(offsets[-1] + len(level))
+    meta = {
+        "version": FORMAT_VERSION,
+        "sample_rate": sample_rate,
+        "sample_count": sample_count,
+        "base_block": BASE_BLOCK,
+        "level_offsets": offsets,
+    }
+
+    tmp_path = data_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.vstack(levels))
+    os.replace(tmp_path, data_path)
+
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def get_pyramid(file_path, cache_dir=CACHE_DIR):
+    digest = file_hash(file_path)
+    pyramid = load_cached(digest, cache_dir)
+    if pyramid is None:
+        samples, rate = decode_audio(file_path)
+        save_pyramid(digest, build_pyramid(samples), rate, len(samples), cache_dir)
+        pyramid = load_cached(digest, cache_dir)
+    return pyramid